@@ -0,0 +1,48 @@
+"""Minimal discord.Interaction / CommandTree stand-ins for driving the real command handlers"""
+import asyncio, time
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.name = f"bench-user-{user_id}"
+        self.bot = False
+
+class FakeResponse:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def defer(self, thinking=False, ephemeral=False):
+        await asyncio.sleep(self.interaction.discord_latency)
+
+class FakeFollowup:
+    def __init__(self, interaction):
+        self.interaction = interaction
+
+    async def send(self, content=None, **kwargs):
+        await self.interaction.edit_original_response(content=content, **kwargs)
+
+class FakeInteraction:
+    """Records every edit instead of talking to Discord"""
+    def __init__(self, user_id, discord_latency=0.0):
+        self.user = FakeUser(user_id)
+        self.discord_latency = discord_latency
+        self.response = FakeResponse(self)
+        self.followup = FakeFollowup(self)
+        self.channel_id = 1
+        self.edits = []
+        self.created = time.perf_counter()
+
+    async def edit_original_response(self, **kwargs):
+        await asyncio.sleep(self.discord_latency)
+        self.edits.append((time.perf_counter() - self.created, kwargs))
+
+class FakeTree:
+    """Captures the handlers define_commands registers, keyed by command name"""
+    def __init__(self):
+        self.commands = {}
+
+    def command(self, name, description=None):
+        def decorator(func):
+            self.commands[name] = func
+            return func
+        return decorator
@@ -0,0 +1,176 @@
+"""Local stand-in for the Vestige Labs API endpoints the bot uses.
+
+Serves a synthetic asset universe with configurable latency and error
+injection so the workflows can be benchmarked without touching the real API.
+"""
+import asyncio, random, time
+from aiohttp import web
+
+# The conversion rate assets have to exist for the rate cache
+USDC_ID = 31566704
+EURS_ID = 227855942
+
+def make_asset(asset_id, ticker, rank, price):
+    now = int(time.time())
+    return {
+        "id": asset_id,
+        "name": f"{ticker} Token",
+        "ticker": ticker,
+        "image": None,
+        "created_at": now - 90 * 86400,
+        "decimals": 6,
+        "total_lockup": 0,
+        "rank": rank,
+        "tvl": price * 1_000_000,
+        "market_cap": price * 10_000_000,
+        "price": price,
+        "price1h": price * 0.99,
+        "price1d": price * 0.95,
+        "price7d": price * 1.1,
+        "volume1h": price * 1_000,
+        "volume1d": price * 24_000,
+        "volume7d": price * 168_000,
+        "swaps1h": 10,
+        "swaps1d": 240,
+        "swaps7d": 1680
+    }
+
+def make_pool(i, asset):
+    """ALGO/asset pool priced at the asset's ALGO price"""
+    algo_reserve = 1_000_000 / (i + 1)
+    return {
+        "pool_id": f"{i:08d}POOL",
+        "asset_1_id": 0,
+        "asset_2_id": asset["id"],
+        "asset_1_reserves": algo_reserve,
+        "asset_2_reserves": algo_reserve / asset["price"],
+        "tvl": 2 * algo_reserve,
+        "volume_24h": 50_000 / ((i * 7) % 120 + 1),
+        "fee_tier": (0.25, 0.3, 1.0)[i % 3]
+    }
+
+class FakeVestige:
+    def __init__(self, assets=1000, latency=0.05, jitter=0.02, error_rate=0.0, seed=7):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.requests = {}
+
+        self.assets = [make_asset(1000 + i, f"TK{i}", i + 1, 1 / (i + 1)) for i in range(assets)]
+        self.assets.append(make_asset(USDC_ID, "USDC", assets + 1, 5.0))
+        self.assets.append(make_asset(EURS_ID, "EURS", assets + 2, 5.4))
+        self.by_id = {asset["id"]: asset for asset in self.assets}
+        self.pool_rows = [make_pool(i, self.assets[i % len(self.assets)]) for i in range(120)]
+
+        self.app = web.Application(middlewares=[self.middleware])
+        self.app.router.add_get("/assets/search", self.search)
+        self.app.router.add_get("/assets/list", self.list)
+        self.app.router.add_get("/assets/{asset_id}/candles", self.candles)
+        self.app.router.add_get("/pools", self.pools)
+        self.app.router.add_get("/swap/routes", self.swap_routes)
+        self.runner = None
+        self.url = None
+
+    @property
+    def tickers(self):
+        return [asset["ticker"] for asset in self.assets]
+
+    async def start(self, host="127.0.0.1", port=0):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+    @web.middleware
+    async def middleware(self, request, handler):
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        self.requests[route] = self.requests.get(route, 0) + 1
+
+        await asyncio.sleep(max(0.0, self.random.gauss(self.latency, self.jitter)))
+        if self.random.random() < self.error_rate:
+            return web.json_response({"error": "injected"}, status=self.random.choice((429, 503)))
+        return await handler(request)
+
+    async def search(self, request):
+        query = request.query.get("query", "").lower().lstrip("$")
+        limit = int(request.query.get("limit", 250))
+        results = [
+            asset for asset in self.assets
+            if query in asset["ticker"].lower() or query == str(asset["id"])
+        ]
+        return web.json_response({"results": results[:limit]})
+
+    async def list(self, request):
+        limit = int(request.query.get("limit", 250))
+        offset = int(request.query.get("offset", 0))
+        if "asset_ids" in request.query:
+            wanted = {int(asset_id) for asset_id in request.query["asset_ids"].split(",")}
+            return web.json_response({"results": [asset for asset in self.assets if asset["id"] in wanted][:limit]})
+        return web.json_response({"results": self.assets[offset:offset + limit]})
+
+    async def candles(self, request):
+        asset = self.by_id.get(int(request.match_info["asset_id"]))
+        if asset is None:
+            return web.json_response([], status=404)
+        interval = int(request.query.get("interval", 7200))
+        now = int(time.time())
+        start = int(request.query.get("start", now - 7 * 86400))
+        start -= start % interval
+
+        candles = []
+        walk = random.Random(asset["id"])
+        price = asset["price"]
+        for timestamp in range(start, now, interval):
+            close = price * (1 + walk.gauss(0, 0.02))
+            candles.append({
+                "timestamp": timestamp,
+                "open": price,
+                "high": max(price, close) * 1.01,
+                "low": min(price, close) * 0.99,
+                "close": close,
+                "volume": 1000
+            })
+            price = close
+        return web.json_response(candles)
+
+    async def pools(self, request):
+        limit = int(request.query.get("limit", 50))
+        offset = int(request.query.get("offset", 0))
+        order_by = request.query.get("order_by", "tvl")
+        pools = list(self.pool_rows)
+        if "asset_id" in request.query:
+            asset_id = int(request.query["asset_id"])
+            pools = [pool for pool in pools if asset_id in (pool["asset_1_id"], pool["asset_2_id"])]
+        pools.sort(key=lambda pool: pool.get(order_by, 0), reverse=request.query.get("order_dir", "desc") == "desc")
+        return web.json_response({"pools": pools[offset:offset + limit]})
+
+    async def swap_routes(self, request):
+        amount = float(request.query.get("amount", 1))
+        asset_in = int(request.query.get("asset_in", 0))
+        asset_out = int(request.query.get("asset_out", 0))
+        # Best direct pool, good enough to cross-check the bot's local quotes against
+        best = None
+        for pool in self.pool_rows:
+            ids = (pool["asset_1_id"], pool["asset_2_id"])
+            if {asset_in, asset_out} != set(ids):
+                continue
+            reserve_in, reserve_out = (
+                (pool["asset_1_reserves"], pool["asset_2_reserves"]) if asset_in == ids[0]
+                else (pool["asset_2_reserves"], pool["asset_1_reserves"]))
+            after_fee = amount * (1 - pool["fee_tier"] / 100)
+            output = reserve_out * after_fee / (reserve_in + after_fee)
+            if best is None or output > best["output_amount"]:
+                best = {
+                    "output_amount": output,
+                    "price_impact": after_fee / (reserve_in + after_fee) * 100,
+                    "hops": [{"pool_id": pool["pool_id"]}]
+                }
+        return web.json_response({"routes": [best] if best else []})
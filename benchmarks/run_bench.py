@@ -0,0 +1,131 @@
+"""Offline benchmark of the /info, /compare, /pools and /swap workflows.
+
+Runs the real command handlers against a local fake Vestige API and fake
+Discord interactions, with N concurrent simulated users, then reports
+throughput and p50/p95/p99 per command stage.
+
+    python -m benchmarks.run_bench --users 20 --requests 10 --latency 50
+"""
+import argparse, asyncio, json, logging, os, random, sys, tempfile, time
+
+from benchmarks.fake_vestige import FakeVestige
+from benchmarks.fake_discord import FakeInteraction, FakeTree
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10, help="concurrent simulated users")
+    parser.add_argument("--requests", type=int, default=10, help="commands per user")
+    parser.add_argument("--mix", default="info=8,pools=1,swap=1", help="command weights")
+    parser.add_argument("--assets", type=int, default=1000, help="size of the fake asset universe")
+    parser.add_argument("--hot", type=int, default=20, help="tickers users pick from, smaller means more repeats")
+    parser.add_argument("--latency", type=float, default=50, help="fake Vestige latency in ms")
+    parser.add_argument("--jitter", type=float, default=20, help="fake Vestige latency jitter in ms")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of Vestige calls answered 429/503")
+    parser.add_argument("--discord-latency", type=float, default=0, help="fake Discord defer/edit latency in ms")
+    parser.add_argument("--cold", action="store_true", help="skip load_the_bot, nothing cached or warmed")
+    parser.add_argument("--json", help="also write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="keep the per-command log lines")
+    parser.add_argument("--seed", type=int, default=1)
+    return parser.parse_args(argv)
+
+async def run(args):
+    fake = FakeVestige(args.assets, args.latency / 1000, args.jitter / 1000, args.error_rate, args.seed)
+    os.environ["VESTIGE_API_URL"] = await fake.start()
+    # Fake tokens and candles go to a throwaway database, never the bot's real cache
+    os.environ["CACHE_DB_PATH"] = os.path.join(tempfile.mkdtemp(prefix="ticker-bench-"), "cache.sqlite3")
+
+    # Imported after the fake is up, consts reads VESTIGE_API_URL and CACHE_DB_PATH at import time
+    from src.Bot import Bot
+    from src.loader import load_the_bot
+    from src.metrics import STAGE_SECONDS, UPSTREAM_SECONDS
+    from commands.bot_commands import define_commands
+
+    if not args.verbose:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    samples = {}
+    def sink(prefix):
+        def record(value, key):
+            samples.setdefault((prefix,) + key, []).append(value)
+        return record
+    STAGE_SECONDS.sink = sink("stage")
+    UPSTREAM_SECONDS.sink = sink("upstream")
+
+    bot = Bot()
+    await bot.vestige.start()
+    if not args.cold:
+        await load_the_bot(bot)
+
+    tree = FakeTree()
+    define_commands(tree, bot)
+
+    weights = dict(part.split("=") for part in args.mix.split(","))
+    commands, command_weights = list(weights), [float(weight) for weight in weights.values()]
+    hot_tickers = fake.tickers[:args.hot]
+    rng = random.Random(args.seed)
+
+    async def user(user_id):
+        for _ in range(args.requests):
+            interaction = FakeInteraction(user_id, args.discord_latency / 1000)
+            command = rng.choices(commands, command_weights)[0]
+            if command == "info":
+                await tree.commands["info"](interaction, rng.choice(hot_tickers))
+            elif command == "compare":
+                await tree.commands["compare"](interaction, ",".join(rng.sample(hot_tickers, 3)))
+            elif command == "pools":
+                await tree.commands["pools"](interaction, None)
+            elif command == "swap":
+                await tree.commands["swap"](interaction, 0, 31566704, 100.0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user(user_id) for user_id in range(args.users)))
+    elapsed = time.perf_counter() - started
+
+    total_commands = args.users * args.requests
+    report = {
+        "commands": total_commands,
+        "seconds": elapsed,
+        "throughput": total_commands / elapsed,
+        "upstream_requests": dict(fake.requests),
+        "stages": {}
+    }
+    for key, values in sorted(samples.items()):
+        report["stages"]["/".join(key)] = {
+            "count": len(values),
+            "p50": percentile(values, 50),
+            "p95": percentile(values, 95),
+            "p99": percentile(values, 99)
+        }
+
+    await bot.close()
+    await fake.stop()
+    return report
+
+def print_report(report):
+    print(f"{report['commands']} commands in {report['seconds']:.2f}s ({report['throughput']:.1f} cmd/s)")
+    print()
+    print(f"{'stage':<48} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, stage in report["stages"].items():
+        print(f"{name:<48} {stage['count']:>7} {stage['p50'] * 1000:>9.1f} {stage['p95'] * 1000:>9.1f} {stage['p99'] * 1000:>9.1f}")
+    print()
+    print("upstream requests served by the fake:")
+    for route, count in sorted(report["upstream_requests"].items()):
+        print(f"  {route:<40} {count:>7}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = asyncio.run(run(args))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    sys.exit(main())
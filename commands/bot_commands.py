@@ -1,12 +1,17 @@
 import discord
+from typing import Literal
 from discord import app_commands
 
 from src.Bot import Bot
 from src.ticker.ticker_workflow import ticker_workflow
+from src.ticker.compare_workflow import compare_workflow
 from src.swap.swap_workflow import swap_workflow
 from src.pools.pool_workflow import pool_workflow
+from src.alerts.alert_workflow import alert_workflow, alerts_workflow, alert_cancel_workflow
 
 from src.logger import notify_bot
+from src.metrics import STAGE_SECONDS, COMMANDS_IN_FLIGHT
+from src.vestige.rate_limiter import Priority, set_priority
 
 def define_commands(tree, bot: Bot):
     @tree.command(
@@ -15,14 +20,34 @@ def define_commands(tree, bot: Bot):
     )
     @app_commands.describe(ticker=f"ticker for the coin you want info on, up to 8 chars")
     async def slash(interaction: discord.Interaction, ticker: str):
-        await interaction.response.defer(thinking=True)
+        with STAGE_SECONDS.time(command="info", stage="defer"):
+            await interaction.response.defer(thinking=True)
         
         if interaction.user.bot: return
         
         notify_bot(interaction, "ticker commmand used")
-        await ticker_workflow(interaction, bot, ticker)
+        set_priority(Priority.INTERACTIVE)
+        with COMMANDS_IN_FLIGHT.track(command="info"), STAGE_SECONDS.time(command="info", stage="total"):
+            await ticker_workflow(interaction, bot, ticker)
         notify_bot(interaction, "ticker complete")
 
+    @tree.command(
+        name = "compare",
+        description="compares several coins side by side on one chart"
+    )
+    @app_commands.describe(tickers="comma separated tickers, e.g. algo,gold,usdc")
+    async def compare_command(interaction: discord.Interaction, tickers: str):
+        with STAGE_SECONDS.time(command="compare", stage="defer"):
+            await interaction.response.defer(thinking=True)
+        
+        if interaction.user.bot: return
+        
+        notify_bot(interaction, "compare command used")
+        set_priority(Priority.INTERACTIVE)
+        with COMMANDS_IN_FLIGHT.track(command="compare"), STAGE_SECONDS.time(command="compare", stage="total"):
+            await compare_workflow(interaction, bot, tickers)
+        notify_bot(interaction, "compare complete")
+
     @tree.command(
         name = "swap",
         description="find the best swap routes between two assets"
@@ -33,12 +58,15 @@ def define_commands(tree, bot: Bot):
         amount="amount to swap"
     )
     async def swap_command(interaction: discord.Interaction, asset_in: int, asset_out: int, amount: float):
-        await interaction.response.defer(thinking=True)
+        with STAGE_SECONDS.time(command="swap", stage="defer"):
+            await interaction.response.defer(thinking=True)
         
         if interaction.user.bot: return
         
         notify_bot(interaction, "swap command used")
-        await swap_workflow(interaction, bot, asset_in, asset_out, amount)
+        set_priority(Priority.BROWSE)
+        with COMMANDS_IN_FLIGHT.track(command="swap"), STAGE_SECONDS.time(command="swap", stage="total"):
+            await swap_workflow(interaction, bot, asset_in, asset_out, amount)
         notify_bot(interaction, "swap complete")
 
     @tree.command(
@@ -49,10 +77,61 @@ def define_commands(tree, bot: Bot):
         asset_id="optional: filter pools by asset ID"
     )
     async def pools_command(interaction: discord.Interaction, asset_id: int = None):
-        await interaction.response.defer(thinking=True)
+        with STAGE_SECONDS.time(command="pools", stage="defer"):
+            await interaction.response.defer(thinking=True)
         
         if interaction.user.bot: return
         
         notify_bot(interaction, "pools command used")
-        await pool_workflow(interaction, bot, asset_id)
+        set_priority(Priority.BROWSE)
+        with COMMANDS_IN_FLIGHT.track(command="pools"), STAGE_SECONDS.time(command="pools", stage="total"):
+            await pool_workflow(interaction, bot, asset_id)
         notify_bot(interaction, "pools complete")
+
+    @tree.command(
+        name = "alert",
+        description="get pinged when a coin goes above or below a price"
+    )
+    @app_commands.describe(
+        ticker="ticker for the coin to watch",
+        direction="fire when the price goes above or below",
+        price="price level",
+        currency="currency the price is in"
+    )
+    async def alert_command(interaction: discord.Interaction, ticker: str, direction: Literal["above", "below"],
+                            price: float, currency: Literal["USD", "EUR", "ALGO"] = "USD"):
+        with STAGE_SECONDS.time(command="alert", stage="defer"):
+            await interaction.response.defer(thinking=True)
+        
+        if interaction.user.bot: return
+        
+        notify_bot(interaction, "alert command used")
+        set_priority(Priority.INTERACTIVE)
+        with COMMANDS_IN_FLIGHT.track(command="alert"), STAGE_SECONDS.time(command="alert", stage="total"):
+            await alert_workflow(interaction, bot, ticker, direction, price, currency)
+        notify_bot(interaction, "alert complete")
+
+    @tree.command(
+        name = "alerts",
+        description="list your active price alerts"
+    )
+    async def alerts_command(interaction: discord.Interaction):
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        
+        if interaction.user.bot: return
+        
+        notify_bot(interaction, "alerts command used")
+        await alerts_workflow(interaction, bot)
+
+    @tree.command(
+        name = "alert_cancel",
+        description="cancel one of your price alerts"
+    )
+    @app_commands.describe(alert_id="alert number from /alerts")
+    async def alert_cancel_command(interaction: discord.Interaction, alert_id: int):
+        await interaction.response.defer(thinking=True, ephemeral=True)
+        
+        if interaction.user.bot: return
+        
+        notify_bot(interaction, "alert_cancel command used")
+        await alert_cancel_workflow(interaction, bot, alert_id)
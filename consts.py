@@ -1,6 +1,106 @@
+import os
+
 HEADERS = {'accept': 'application/json', 'User-Agent': 'Mozilla/5.0 (Windows; U; Windows NT 5.1; en-US; rv:1.9.0.7) Gecko/2009021910 Firefox/3.0.7'}
 
 NETWORK_ID = 0
-SEARCH_URL = "https://api.vestigelabs.org/assets/search?network_id=0&query={}&order_by=rank&order_dir=asc&limit=250" # Updated to Vestige Labs API
+VESTIGE_API_URL = os.environ.get("VESTIGE_API_URL", "https://api.vestigelabs.org")
+SEARCH_URL = VESTIGE_API_URL + "/assets/search?network_id=0&query={}&order_by=rank&order_dir=asc&limit=250" # Updated to Vestige Labs API
 
 CANDLE_INTERVALS = 10000
+
+# Vestige client, connections are kept warm and shared by every workflow
+VESTIGE_POOL_SIZE = int(os.environ.get("VESTIGE_POOL_SIZE", "20"))
+VESTIGE_POOL_SIZE_PER_HOST = int(os.environ.get("VESTIGE_POOL_SIZE_PER_HOST", "10"))
+VESTIGE_KEEPALIVE = float(os.environ.get("VESTIGE_KEEPALIVE", "60"))
+VESTIGE_TIMEOUT = float(os.environ.get("VESTIGE_TIMEOUT", "10"))
+VESTIGE_MAX_RETRIES = int(os.environ.get("VESTIGE_MAX_RETRIES", "3"))
+VESTIGE_BACKOFF_BASE = float(os.environ.get("VESTIGE_BACKOFF_BASE", "0.25"))
+VESTIGE_BACKOFF_MAX = float(os.environ.get("VESTIGE_BACKOFF_MAX", "4"))
+
+# ALGO -> fiat rates, Currency Name -> Asset ID (USDC: 31566704, EURS: 227855942)
+CURRENCY_ASSETS = {
+    "USD": 31566704,
+    "EUR": 227855942
+}
+RATE_REFRESH_INTERVAL = float(os.environ.get("RATE_REFRESH_INTERVAL", "60"))
+RATE_MAX_AGE = float(os.environ.get("RATE_MAX_AGE", "300"))
+
+# Local ticker -> asset index, bulk loaded at startup and refreshed a page at a time
+LIST_URL = VESTIGE_API_URL + "/assets/list"
+INDEX_PAGE_SIZE = int(os.environ.get("INDEX_PAGE_SIZE", "250"))
+INDEX_MAX_ASSETS = int(os.environ.get("INDEX_MAX_ASSETS", "2500"))
+INDEX_REFRESH_INTERVAL = float(os.environ.get("INDEX_REFRESH_INTERVAL", "30"))
+
+# Chart rendering, off the event loop with a bounded backlog
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", "2"))
+RENDER_QUEUE_LIMIT = int(os.environ.get("RENDER_QUEUE_LIMIT", "8"))
+RENDER_TIMEOUT = float(os.environ.get("RENDER_TIMEOUT", "10"))
+CHART_CACHE_BYTES = int(os.environ.get("CHART_CACHE_BYTES", str(16 * 1024 * 1024)))
+# "matplotlib" or "pillow", pillow skips the matplotlib import entirely
+CHART_BACKEND = os.environ.get("CHART_BACKEND", "matplotlib").lower()
+# Chart upload encoding, "png8" (palette PNG), "png" (full RGBA) or "webp"
+CHART_FORMAT = os.environ.get("CHART_FORMAT", "png8").lower()
+CHART_COLORS = int(os.environ.get("CHART_COLORS", "64"))
+
+# Identical concurrent Vestige calls share one request, successful results are reused this long
+SINGLE_FLIGHT_TTL = float(os.environ.get("SINGLE_FLIGHT_TTL", "5"))
+
+# Per-asset candle store, repeat lookups only fetch the candles since the last one
+CANDLE_RETENTION = int(os.environ.get("CANDLE_RETENTION", str(7 * 24 * 3600)))
+CANDLE_STORE_ASSETS = int(os.environ.get("CANDLE_STORE_ASSETS", "500"))
+CANDLE_FRESHNESS = float(os.environ.get("CANDLE_FRESHNESS", "15"))
+
+# Warmer, keeps the top ranked and most queried assets' candles and charts ready
+WARM_TOP_N = int(os.environ.get("WARM_TOP_N", "25"))
+WARM_RECENT_N = int(os.environ.get("WARM_RECENT_N", "25"))
+WARM_INTERVAL = float(os.environ.get("WARM_INTERVAL", "300"))
+WARM_CONCURRENCY = int(os.environ.get("WARM_CONCURRENCY", "2"))
+
+# Token bucket in front of every Vestige call, requests per second and burst size
+VESTIGE_RATE = float(os.environ.get("VESTIGE_RATE", "10"))
+VESTIGE_BURST = int(os.environ.get("VESTIGE_BURST", "20"))
+
+# On-disk copy of token metadata and candles, empty disables it
+CACHE_DB_PATH = os.environ.get("CACHE_DB_PATH", "./cache/ticker-bot.sqlite3")
+
+# Stale-while-revalidate for /info, per field. Data younger than *_FRESH is shown as is,
+# up to *_STALE it's shown right away and refreshed in the background, older is fetched first
+INFO_PRICE_FRESH = float(os.environ.get("INFO_PRICE_FRESH", "30"))
+INFO_PRICE_STALE = float(os.environ.get("INFO_PRICE_STALE", "300"))
+INFO_CHART_FRESH = float(os.environ.get("INFO_CHART_FRESH", "60"))
+INFO_CHART_STALE = float(os.environ.get("INFO_CHART_STALE", "900"))
+# Relative price move worth editing an already sent response for
+INFO_MATERIAL_CHANGE = float(os.environ.get("INFO_MATERIAL_CHANGE", "0.005"))
+
+# /pools browser, pools per page and how long a fetched listing is reused
+POOLS_PAGE_SIZE = int(os.environ.get("POOLS_PAGE_SIZE", "10"))
+POOLS_TTL = float(os.environ.get("POOLS_TTL", "60"))
+POOLS_CACHE_ENTRIES = int(os.environ.get("POOLS_CACHE_ENTRIES", "200"))
+
+# Local swap quotes from cached pool reserves, cross-checked against /swap/routes
+SWAP_GRAPH_POOLS = int(os.environ.get("SWAP_GRAPH_POOLS", "1000"))
+SWAP_GRAPH_REFRESH = float(os.environ.get("SWAP_GRAPH_REFRESH", "60"))
+SWAP_MAX_HOPS = int(os.environ.get("SWAP_MAX_HOPS", "3"))
+SWAP_FANOUT = int(os.environ.get("SWAP_FANOUT", "8"))
+# Fraction of local quotes also asked remotely, and how far apart they may be before the pair goes remote
+SWAP_CROSS_CHECK_RATE = float(os.environ.get("SWAP_CROSS_CHECK_RATE", "0.1"))
+SWAP_MAX_DEVIATION = float(os.environ.get("SWAP_MAX_DEVIATION", "0.01"))
+SWAP_DISTRUST_TTL = float(os.environ.get("SWAP_DISTRUST_TTL", "600"))
+
+# /compare, how many tickers at once and the shared candle fetch budget
+COMPARE_MAX_TICKERS = int(os.environ.get("COMPARE_MAX_TICKERS", "5"))
+COMPARE_CONCURRENCY = int(os.environ.get("COMPARE_CONCURRENCY", "3"))
+COMPARE_CANDLE_BUDGET = float(os.environ.get("COMPARE_CANDLE_BUDGET", "5"))
+
+# Price alerts, every alerted asset is polled once per tick in batches
+ALERT_INTERVAL = float(os.environ.get("ALERT_INTERVAL", "30"))
+ALERT_BATCH_SIZE = int(os.environ.get("ALERT_BATCH_SIZE", "50"))
+ALERT_MAX_PER_USER = int(os.environ.get("ALERT_MAX_PER_USER", "10"))
+
+# Live /info messages, refreshed per asset on a shared loop. Interaction tokens last
+# 15 minutes, so a live message stops after LIVE_MAX_DURATION without a click
+LIVE_INTERVAL = float(os.environ.get("LIVE_INTERVAL", "30"))
+LIVE_MAX_DURATION = float(os.environ.get("LIVE_MAX_DURATION", "600"))
+LIVE_MAX_MESSAGES = int(os.environ.get("LIVE_MAX_MESSAGES", "50"))
+# Seconds between edits in one channel, Discord allows about 5 per 5s
+LIVE_EDIT_SPACING = float(os.environ.get("LIVE_EDIT_SPACING", "1"))
@@ -7,6 +7,9 @@ import threading
 import time
 from http.server import BaseHTTPRequestHandler, HTTPServer
 
+from src.metrics import METRICS
+from src.startup import STARTUP
+
 # DigitalOcean commonly sets PORT; default to 8080
 PORT = int(os.environ.get("PORT", "8080"))
 
@@ -23,6 +26,16 @@ def start_health_check_server():
                         self.wfile.write(b"OK")
                     except BrokenPipeError:
                         pass
+                elif self.path == "/metrics":
+                    try:
+                        body = METRICS.render().encode()
+                        self.send_response(200)
+                        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                        self.send_header("Content-Length", str(len(body)))
+                        self.end_headers()
+                        self.wfile.write(body)
+                    except BrokenPipeError:
+                        pass
                 else:
                     self.send_response(404)
                     self.end_headers()
@@ -60,6 +73,7 @@ def start_health_check_server():
 async def run_bot_forever():
     """Run bot loops forever, even if imports fail."""
     while True:
+        STARTUP.begin()
         try:
             # Import dependencies inside the loop
             # If deps are missing, this loop will keep printing errors but container stays UP
@@ -70,6 +84,8 @@ async def run_bot_forever():
             from src.Bot import Bot
             from src.on_ready import on_ready
             from src.core_config import load_the_commands
+            # Chart backends aren't in here, they're imported on first use or warmed after ready
+            STARTUP.mark("imports")
 
             load_dotenv()
             discord_token = os.environ.get("DISCORD_TOKEN")
@@ -81,6 +97,7 @@ async def run_bot_forever():
                 continue
 
             bot = Bot()
+            STARTUP.mark("bot_created")
 
             class MyClient(discord.Client):
                 def __init__(self, intents):
@@ -97,13 +114,23 @@ async def run_bot_forever():
 
             try:
                 load_the_commands(client, tree, bot)
+                STARTUP.mark("commands_loaded")
                 print("✓ Commands loaded successfully", flush=True)
             except Exception as e:
                 print(f"✗ ERROR loading commands: {e}", flush=True)
                 traceback.print_exc()
 
             print("Attempting to connect to Discord...", flush=True)
-            await client.start(discord_token)
+            try:
+                # client.start split in two so the REST login and the gateway are timed apart
+                await client.login(discord_token)
+                STARTUP.mark("login")
+                await client.connect()
+            finally:
+                await bot.close()
+
+            if STARTUP.exit_when_ready:
+                return
 
             print("Discord bot stopped unexpectedly (restarting in 10s)", flush=True)
             await asyncio.sleep(10)
@@ -129,6 +156,9 @@ async def main():
 if __name__ == "__main__":
     try:
         print("--- APP STARTUP ---", flush=True)
+
+        # Boot, print where the time went once ready on the gateway, then exit
+        STARTUP.exit_when_ready = "--profile-startup" in sys.argv[1:]
         
         # 1. Start health check server SYNCHRONOUSLY before anything else
         if not start_health_check_server():
@@ -142,4 +172,5 @@ if __name__ == "__main__":
         print(f"FATAL ERROR at root: {e}", flush=True)
         traceback.print_exc()
     finally:
-        keep_alive()
+        if not STARTUP.exit_when_ready:
+            keep_alive()
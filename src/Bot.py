@@ -1,5 +1,78 @@
+from consts import CACHE_DB_PATH
+from src.vestige.vestige_client import VestigeClient
+from src.DiskCache import DiskCache
+from src.ticker.RateCache import RateCache
+from src.ticker.TickerIndex import TickerIndex
+from src.ticker.RenderService import RenderService
+from src.ticker.CandleStore import CandleStore
+from src.ticker.Warmer import Warmer
+from src.ticker.LiveTicker import LiveTicker
+from src.pools.PoolCache import PoolCache
+from src.swap.RouteEngine import RouteEngine
+from src.alerts.AlertEngine import AlertEngine
+from src.metrics import METRICS
+
 class Bot:
     def __init__(self):
         self.locked = type
         self.management_channel = None
-        self.ticker_data = {}
+        # Discord client, set in on_ready for messages sent outside of a command
+        self.client = None
+
+        # Shared Vestige API client, session is opened in on_ready
+        self.vestige = VestigeClient()
+
+        # Token metadata and candles kept across restarts, opened by load_the_bot
+        self.disk = DiskCache(CACHE_DB_PATH)
+
+        # Ticker -> asset index, bulk loaded by load_the_bot
+        self.ticker_data = TickerIndex(self.vestige, self.disk)
+
+        # ALGO -> fiat rates, loaded and refreshed by load_the_bot
+        self.rates = RateCache(self.vestige)
+
+        # Candle series per asset, topped up with deltas
+        self.candles = CandleStore(self.vestige, self.disk)
+
+        # Chart rendering worker pool
+        self.renderer = RenderService()
+
+        # /pools listings, paged in from Vestige as people browse
+        self.pools = PoolCache(self.vestige)
+
+        # Local swap quotes over cached pool reserves, built by load_the_bot
+        self.routes = RouteEngine(self.vestige)
+
+        # Price alerts, restored from disk and polled by load_the_bot
+        self.alerts = AlertEngine(self.vestige, self.ticker_data, self.rates, self.disk)
+
+        # Live /info messages, refreshed per asset on one loop
+        self.live = LiveTicker()
+
+        # Background preloading of top ranked and popular assets
+        self.warmer = Warmer()
+
+        # Scraped on /metrics, re-registering on restart replaces the old bot's
+        METRICS.collector("rate_limiter", self.vestige.limiter.stats)
+        METRICS.collector("single_flight", self.vestige.flights.stats)
+        METRICS.collector("ticker_index", self.ticker_data.stats)
+        METRICS.collector("candle_store", self.candles.stats)
+        METRICS.collector("chart_cache", self.renderer.cache.stats)
+        METRICS.collector("renderer", lambda: {"queue_depth": self.renderer.queue_depth})
+        METRICS.collector("rates", lambda: {"stale": int(self.rates.stale)})
+        METRICS.collector("warmer", self.warmer.stats)
+        METRICS.collector("pool_cache", self.pools.stats)
+        METRICS.collector("swap_routes", self.routes.stats)
+        METRICS.collector("alerts", self.alerts.stats)
+        METRICS.collector("live", self.live.stats)
+
+    async def close(self):
+        await self.warmer.stop()
+        await self.routes.stop()
+        await self.alerts.stop()
+        await self.live.stop()
+        await self.rates.stop()
+        await self.ticker_data.stop()
+        await self.vestige.close()
+        self.renderer.close()
+        await self.disk.close()
@@ -0,0 +1,188 @@
+import asyncio, json, logging, os, sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tokens (
+    asset_id INTEGER PRIMARY KEY,
+    json TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candles (
+    asset_id INTEGER NOT NULL,
+    interval INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    open REAL NOT NULL,
+    high REAL NOT NULL,
+    low REAL NOT NULL,
+    close REAL NOT NULL,
+    PRIMARY KEY (asset_id, interval, timestamp)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS alerts (
+    alert_id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    channel_id INTEGER,
+    asset_id INTEGER NOT NULL,
+    ticker TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    price REAL NOT NULL,
+    currency TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS candle_meta (
+    asset_id INTEGER NOT NULL,
+    interval INTEGER NOT NULL,
+    covered_from INTEGER NOT NULL,
+    fetched_at INTEGER NOT NULL,
+    PRIMARY KEY (asset_id, interval)
+);
+"""
+
+class DiskCache:
+    """SQLite copy of token metadata, candle history and price alerts that survives restarts.
+
+    Every statement runs on one dedicated thread, so the event loop never
+    touches the disk. Writes are fire-and-forget and run in submission order.
+    Reads are awaited and queue behind the writes already submitted.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.executor = None
+        self.conn = None
+
+    @property
+    def enabled(self):
+        return self.conn is not None
+
+    async def open(self):
+        """Open (and create) the database, safe to call on every on_ready"""
+        if self.executor is not None or not self.path:
+            return
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="disk-cache")
+        try:
+            await self.run(self.connect)
+        except Exception as e:
+            logger.warning(f"disk cache disabled :: {e}", extra={"user": "disk", "id": "-"})
+            self.executor.shutdown(wait=False)
+            self.executor = None
+
+    def connect(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(SCHEMA)
+        conn.commit()
+        self.conn = conn
+
+    async def close(self):
+        if self.executor is None:
+            return
+        if self.conn is not None:
+            # Queued behind pending writes, so those land first
+            await self.run(self.conn.close)
+            self.conn = None
+        self.executor.shutdown(wait=True)
+        self.executor = None
+
+    async def run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    def write(self, func, *args):
+        """Queue a write without waiting on it"""
+        if not self.enabled:
+            return
+        future = asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+        future.add_done_callback(self.report)
+
+    def report(self, future):
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"disk cache write failed :: {future.exception()}", extra={"user": "disk", "id": "-"})
+
+    # Tokens
+
+    async def load_tokens(self):
+        if not self.enabled:
+            return []
+        rows = await self.run(lambda: self.conn.execute("SELECT json FROM tokens").fetchall())
+        return [json.loads(row[0]) for row in rows]
+
+    def save_tokens(self, tokens):
+        """Write through a batch of asset json dicts"""
+        rows = [(token["id"], json.dumps(token)) for token in tokens]
+        if rows:
+            self.write(self.upsert_tokens, rows)
+
+    def upsert_tokens(self, rows):
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO tokens (asset_id, json) VALUES (?, ?)", rows)
+
+    # Candles
+
+    async def load_candles(self, asset_id, interval):
+        """(candles, covered_from, fetched_at) for a stored series, None if there isn't one"""
+        if not self.enabled:
+            return None
+        return await self.run(self.select_candles, asset_id, interval)
+
+    def select_candles(self, asset_id, interval):
+        meta = self.conn.execute(
+            "SELECT covered_from, fetched_at FROM candle_meta WHERE asset_id = ? AND interval = ?",
+            (asset_id, interval)).fetchone()
+        if meta is None:
+            return None
+        rows = self.conn.execute(
+            "SELECT timestamp, open, high, low, close FROM candles WHERE asset_id = ? AND interval = ? ORDER BY timestamp",
+            (asset_id, interval)).fetchall()
+        candles = [
+            {"timestamp": timestamp, "open": open_, "high": high, "low": low, "close": close}
+            for timestamp, open_, high, low, close in rows
+        ]
+        return candles, meta[0], meta[1]
+
+    def save_candles(self, asset_id, interval, candles, covered_from, fetched_at, replace=False):
+        """Write through fetched candles, `replace` drops whatever was stored for the series first"""
+        rows = [
+            (asset_id, interval, int(candle["timestamp"]), float(candle["open"]), float(candle["high"]),
+             float(candle["low"]), float(candle["close"]))
+            for candle in candles
+        ]
+        self.write(self.upsert_candles, asset_id, interval, rows, covered_from, fetched_at, replace)
+
+    def upsert_candles(self, asset_id, interval, rows, covered_from, fetched_at, replace):
+        with self.conn:
+            if replace:
+                self.conn.execute("DELETE FROM candles WHERE asset_id = ? AND interval = ?", (asset_id, interval))
+            self.conn.executemany("INSERT OR REPLACE INTO candles VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            # Retention trimming happens here too, nothing older than the window stays on disk
+            self.conn.execute(
+                "DELETE FROM candles WHERE asset_id = ? AND interval = ? AND timestamp < ?",
+                (asset_id, interval, covered_from))
+            self.conn.execute(
+                "INSERT OR REPLACE INTO candle_meta VALUES (?, ?, ?, ?)",
+                (asset_id, interval, covered_from, fetched_at))
+
+    # Alerts
+
+    async def load_alerts(self):
+        """Every stored alert as a row tuple in the table's column order"""
+        if not self.enabled:
+            return []
+        return await self.run(lambda: self.conn.execute("SELECT * FROM alerts ORDER BY alert_id").fetchall())
+
+    def save_alert(self, row):
+        self.write(self.insert_alert, row)
+
+    def insert_alert(self, row):
+        with self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO alerts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+
+    def delete_alerts(self, alert_ids):
+        if alert_ids:
+            self.write(self.remove_alerts, [(alert_id,) for alert_id in alert_ids])
+
+    def remove_alerts(self, rows):
+        with self.conn:
+            self.conn.executemany("DELETE FROM alerts WHERE alert_id = ?", rows)
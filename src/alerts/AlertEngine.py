@@ -0,0 +1,242 @@
+import asyncio, itertools, logging, math, time
+from bisect import bisect_left, bisect_right, insort
+
+from src.ticker.TokenInfo import TokenInfo
+from consts import NETWORK_ID, LIST_URL, ALERT_INTERVAL, ALERT_BATCH_SIZE, ALERT_MAX_PER_USER
+from src.vestige.rate_limiter import Priority, set_priority
+
+logger = logging.getLogger(__name__)
+
+ABOVE, BELOW = "above", "below"
+
+class Alert:
+    __slots__ = ("alert_id", "user_id", "channel_id", "asset_id", "ticker", "direction", "price", "currency", "created_at")
+
+    def __init__(self, alert_id, user_id, channel_id, asset_id, ticker, direction, price, currency, created_at):
+        self.alert_id = alert_id
+        self.user_id = user_id
+        self.channel_id = channel_id
+        self.asset_id = asset_id
+        self.ticker = ticker
+        self.direction = direction
+        self.price = price
+        self.currency = currency
+        self.created_at = created_at
+
+    def row(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def entry(self):
+        return (self.price, self.alert_id)
+
+class ThresholdBook:
+    """One asset's alerts in one currency, kept as two sorted (price, alert_id) lists.
+
+    `above` fires from the low end up to the current price, `below` from the
+    high end down to it, so a tick is a bisect plus the alerts that fired.
+    """
+    __slots__ = ("above", "below")
+
+    def __init__(self):
+        self.above = []
+        self.below = []
+
+    def __bool__(self):
+        return bool(self.above or self.below)
+
+    def side(self, direction):
+        return self.above if direction == ABOVE else self.below
+
+    def add(self, alert: Alert):
+        insort(self.side(alert.direction), alert.entry())
+
+    def remove(self, alert: Alert):
+        side = self.side(alert.direction)
+        i = bisect_left(side, alert.entry())
+        if i < len(side) and side[i] == alert.entry():
+            del side[i]
+
+    def pop_triggered(self, price):
+        """alert_ids whose threshold the price has reached, removed from the book"""
+        cut = bisect_right(self.above, (price, math.inf))
+        fired = [alert_id for _, alert_id in self.above[:cut]]
+        del self.above[:cut]
+
+        cut = bisect_left(self.below, (price, -math.inf))
+        fired += [alert_id for _, alert_id in self.below[cut:]]
+        del self.below[cut:]
+        return fired
+
+class AlertEngine:
+    """Price alerts checked on a shared poll.
+
+    Each tick fetches every alerted asset once, however many alerts point at
+    it, in batches of `batch_size` through the asset list endpoint. Prices are
+    checked against per (asset, currency) ThresholdBooks. Alerts are one-shot
+    and written through to the disk cache, so they survive restarts.
+    """
+    def __init__(self, vestige, ticker_data, rates, disk=None, interval=ALERT_INTERVAL,
+                 batch_size=ALERT_BATCH_SIZE, max_per_user=ALERT_MAX_PER_USER):
+        self.vestige = vestige
+        self.ticker_data = ticker_data
+        self.rates = rates
+        self.disk = disk
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_per_user = max_per_user
+
+        self.alerts = {}
+        # asset_id -> currency -> ThresholdBook
+        self.books = {}
+        self.ids = itertools.count(1)
+        self.client = None
+        self.task = None
+
+        self.ticks = 0
+        self.fired = 0
+
+    def __len__(self):
+        return len(self.alerts)
+
+    def stats(self):
+        return {
+            "alerts": len(self.alerts),
+            "assets": len(self.books),
+            "ticks": self.ticks,
+            "fired": self.fired
+        }
+
+    async def start(self, client=None):
+        """Restore alerts from disk and start polling, safe to call on every on_ready"""
+        self.client = client
+        if self.task and not self.task.done():
+            return
+        if self.disk and not self.alerts:
+            for row in await self.disk.load_alerts():
+                self.index(Alert(*row))
+            self.ids = itertools.count(max(self.alerts, default=0) + 1)
+        self.task = asyncio.create_task(self.poll_forever())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    def index(self, alert: Alert):
+        self.alerts[alert.alert_id] = alert
+        self.books.setdefault(alert.asset_id, {}).setdefault(alert.currency, ThresholdBook()).add(alert)
+
+    def unindex(self, alert: Alert):
+        self.alerts.pop(alert.alert_id, None)
+        currencies = self.books.get(alert.asset_id, {})
+        book = currencies.get(alert.currency)
+        if book is not None:
+            book.remove(alert)
+            if not book:
+                del currencies[alert.currency]
+        if not currencies:
+            self.books.pop(alert.asset_id, None)
+
+    def user_alerts(self, user_id):
+        return [alert for alert in self.alerts.values() if alert.user_id == user_id]
+
+    def add(self, user_id, channel_id, token: TokenInfo, direction, price, currency):
+        """Register an alert, returns it or None when the user is at their limit"""
+        if len(self.user_alerts(user_id)) >= self.max_per_user:
+            return None
+        alert = Alert(next(self.ids), user_id, channel_id, token.asset_id, token.ticker, direction, price, currency, int(time.time()))
+        self.index(alert)
+        if self.disk:
+            self.disk.save_alert(alert.row())
+        return alert
+
+    def cancel(self, user_id, alert_id):
+        """Remove one of the user's alerts, False if they have no such alert"""
+        alert = self.alerts.get(alert_id)
+        if alert is None or alert.user_id != user_id:
+            return False
+        self.unindex(alert)
+        if self.disk:
+            self.disk.delete_alerts([alert_id])
+        return True
+
+    def convert(self, price_in_algo, currency):
+        """ALGO price in `currency`, None if there's no rate for it"""
+        rate = 1 if currency == "ALGO" else self.rates.rates.get(currency)
+        return None if rate is None or price_in_algo is None else price_in_algo * rate
+
+    async def poll_forever(self):
+        set_priority(Priority.BACKGROUND)
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.warning(f"alert tick failed :: {e}", extra={"user": "alerts", "id": "-"})
+
+    async def tick(self):
+        asset_ids = list(self.books)
+        if not asset_ids:
+            return
+        batches = [asset_ids[i:i + self.batch_size] for i in range(0, len(asset_ids), self.batch_size)]
+        results = await asyncio.gather(*(self.fetch_prices(batch) for batch in batches))
+        self.ticks += 1
+
+        fired = []
+        for prices in results:
+            for asset_id, price_in_algo in prices.items():
+                for currency, book in list(self.books.get(asset_id, {}).items()):
+                    current = self.convert(price_in_algo, currency)
+                    if current is None:
+                        continue
+                    for alert_id in book.pop_triggered(current):
+                        fired.append((self.alerts[alert_id], current))
+
+        for alert, _ in fired:
+            self.unindex(alert)
+        if fired and self.disk:
+            self.disk.delete_alerts([alert.alert_id for alert, _ in fired])
+        self.fired += len(fired)
+        await asyncio.gather(*(self.deliver(alert, current) for alert, current in fired))
+
+    async def fetch_prices(self, asset_ids):
+        """asset_id -> ALGO price for one batch, the rows also refresh the ticker index"""
+        params = {
+            "network_id": NETWORK_ID,
+            "asset_ids": ",".join(map(str, asset_ids)),
+            "limit": len(asset_ids)
+        }
+        try:
+            status, data = await self.vestige.get(LIST_URL, params=params)
+        except Exception as e:
+            logger.warning(f"alert prices failed :: {e}", extra={"user": "alerts", "id": "-"})
+            return {}
+        if status != 200:
+            logger.warning(f"alert prices failed :: {status}", extra={"user": "alerts", "id": "-"})
+            return {}
+
+        results = data.get("results", []) if isinstance(data, dict) else data
+        wanted = set(asset_ids)
+        tokens = [TokenInfo(row) for row in results if row.get("id") in wanted]
+        prices = {token.asset_id: token.price for token in tokens}
+        self.ticker_data.add_many(tokens)
+        return prices
+
+    async def deliver(self, alert: Alert, current):
+        message = (
+            f"<@{alert.user_id}> 🔔 ${alert.ticker.lstrip('$')} is {alert.direction} "
+            f"{alert.price:,.8g} {alert.currency} (now {current:,.8g} {alert.currency})"
+        )
+        logger.info(f"alert {alert.alert_id} fired", extra={"user": "alerts", "id": alert.user_id})
+        if self.client is None:
+            return
+        try:
+            channel = self.client.get_channel(alert.channel_id) or await self.client.fetch_channel(alert.channel_id)
+            await channel.send(message)
+        except Exception:
+            # Channel gone or no access any more, a DM still gets it to them
+            try:
+                user = await self.client.fetch_user(alert.user_id)
+                await user.send(message)
+            except Exception as e:
+                logger.warning(f"alert {alert.alert_id} undeliverable :: {e}", extra={"user": "alerts", "id": alert.user_id})
@@ -0,0 +1,78 @@
+import discord, datetime
+
+from src.Bot import Bot
+from src.alerts.AlertEngine import ABOVE
+from src.ticker.utils import get_ticker_info, get_fresh_token, get_currencies, POSTFIXES
+from consts import INFO_PRICE_FRESH
+
+from src.logger import notify_bot, notify_admin
+
+def format_price(price, currency):
+    return f"{price:,.8g}{POSTFIXES.get(currency, ' ' + currency)}"
+
+async def alert_workflow(interaction: discord.Interaction, bot: Bot, ticker: str, direction: str, price: float, currency: str):
+    """Handle /alert, registers a one-shot price alert"""
+    try:
+        if price <= 0:
+            await interaction.edit_original_response(content="The price has to be above zero")
+            return None
+
+        token = await get_ticker_info(interaction, bot, ticker.lower())
+        if token == None:
+            await interaction.edit_original_response(content="Ticker not found")
+            return None
+
+        # Already past the level, it would only fire on the next tick anyway. Checked against
+        # a price no older than a poll interval or so, the index one can be minutes old
+        token = await get_fresh_token(interaction, bot, token, INFO_PRICE_FRESH)
+        currencies, _ = await get_currencies(interaction, bot)
+        rate = currencies.get(currency) if currencies else None
+        if rate is not None and token.price is not None:
+            current = token.price * rate
+            if (current >= price) if direction == ABOVE else (current <= price):
+                await interaction.edit_original_response(
+                    content=f"${token.ticker.lstrip('$')} is already {direction} that, it's at {format_price(current, currency)}")
+                return None
+
+        alert = bot.alerts.add(interaction.user.id, interaction.channel_id, token, direction, price, currency)
+        if alert is None:
+            await interaction.edit_original_response(
+                content=f"You already have {bot.alerts.max_per_user} alerts, cancel one with `/alert_cancel` first")
+            return None
+
+        await interaction.edit_original_response(
+            content=f"🔔 Alert #{alert.alert_id} set, I'll ping you here when ${token.ticker.lstrip('$')} goes "
+                    f"{direction} {format_price(price, currency)}")
+
+    except Exception as e:
+        await interaction.edit_original_response(content="Something bad happened, and I need an adult...")
+        await notify_admin(interaction, bot, f"Alert: {ticker} {direction} {price} :: Reason: {e}")
+
+async def alerts_workflow(interaction: discord.Interaction, bot: Bot):
+    """Handle /alerts, lists the user's active alerts"""
+    alerts = bot.alerts.user_alerts(interaction.user.id)
+    if not alerts:
+        await interaction.edit_original_response(content="You have no active alerts")
+        return None
+
+    embed = discord.Embed(
+        title="Your price alerts",
+        colour=discord.Colour.green()
+    )
+    for alert in sorted(alerts, key=lambda alert: alert.alert_id):
+        created = datetime.datetime.fromtimestamp(alert.created_at, datetime.timezone.utc)
+        embed.add_field(
+            name=f"#{alert.alert_id} ${alert.ticker.lstrip('$')}",
+            value=f"{alert.direction} {format_price(alert.price, alert.currency)}\nset {discord.utils.format_dt(created, 'R')}",
+            inline=True
+        )
+    embed.set_footer(text="Alerts fire once, remove one early with /alert_cancel")
+    await interaction.edit_original_response(embed=embed)
+
+async def alert_cancel_workflow(interaction: discord.Interaction, bot: Bot, alert_id: int):
+    """Handle /alert_cancel"""
+    if bot.alerts.cancel(interaction.user.id, alert_id):
+        notify_bot(interaction, f"alert {alert_id} cancelled")
+        await interaction.edit_original_response(content=f"Alert #{alert_id} cancelled")
+    else:
+        await interaction.edit_original_response(content=f"You don't have an alert #{alert_id}")
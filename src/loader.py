@@ -1,5 +1,33 @@
+from functools import partial
+
 from src.Bot import Bot
+from src.ticker.live_workflow import refresh_live
+from src.startup import STARTUP
 
 async def load_the_bot(bot: Bot):
-    pass
-    
\ No newline at end of file
+    # Only the essentials hold the lock, everything else warms up in the background
+
+    # Disk cache, the index and candle store restore from it
+    await bot.disk.open()
+    STARTUP.mark("disk_cache")
+
+    # Conversion rates, refreshed in the background from here on
+    await bot.rates.start()
+    STARTUP.mark("rates")
+
+    # Ticker index, the top ranked page now and the rest of the universe after
+    await bot.ticker_data.start()
+    STARTUP.mark("ticker_index")
+
+    # Price alerts from before the restart, then polled every tick
+    await bot.alerts.start(bot.client)
+    STARTUP.mark("alerts")
+
+    # Shared refresh loop for live /info messages
+    bot.live.start(partial(refresh_live, bot))
+
+    # Liquidity graph for local swap quotes, /swap goes remote until it's built
+    bot.routes.start()
+
+    # Candles and charts for the top ranked and most queried assets
+    bot.warmer.start(bot)
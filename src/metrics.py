@@ -0,0 +1,169 @@
+import threading, time
+from contextlib import contextmanager
+
+# Seconds, covers everything from a cache hit to a slow upstream call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+def format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+class Metric:
+    kind = None
+
+    def __init__(self, registry, name, help, labels=()):
+        self.registry = registry
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.values = {}
+
+    def key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labels)
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, value=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def render(self):
+        return [f"{self.name}{format_labels(self.labels, key)} {value}" for key, value in self.values.items()]
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        with self.registry.lock:
+            self.values[self.key(labels)] = value
+
+    def inc(self, value=1, **labels):
+        key = self.key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + value
+
+    def dec(self, value=1, **labels):
+        self.inc(-value, **labels)
+
+    @contextmanager
+    def track(self, **labels):
+        """Count something as in progress for the duration of the block"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def render(self):
+        return [f"{self.name}{format_labels(self.labels, key)} {value}" for key, value in self.values.items()]
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, registry, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, help, labels)
+        self.buckets = tuple(buckets)
+        # Optional callable(value, label_values) seeing every raw observation, the benchmarks use it
+        self.sink = None
+
+    def observe(self, value, **labels):
+        key = self.key(labels)
+        if self.sink is not None:
+            self.sink(value, key)
+        with self.registry.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                # per bucket counts, then sum and count
+                counts = self.values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the block took, works around awaits too"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def render(self):
+        lines = []
+        for key, counts in self.values.items():
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{format_labels(self.labels, key, [('le', bound)])} {count}")
+            lines.append(f"{self.name}_bucket{format_labels(self.labels, key, [('le', '+Inf')])} {counts[-1]}")
+            lines.append(f"{self.name}_sum{format_labels(self.labels, key)} {counts[-2]}")
+            lines.append(f"{self.name}_count{format_labels(self.labels, key)} {counts[-1]}")
+        return lines
+
+class Registry:
+    """Process-wide metrics, written from the bot loop and scraped from the health server thread"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = []
+        # name -> callable returning {metric_name: value}, read at scrape time
+        self.collectors = {}
+
+    def counter(self, name, help, labels=()):
+        return self.add(Counter(self, name, help, labels))
+
+    def gauge(self, name, help, labels=()):
+        return self.add(Gauge(self, name, help, labels))
+
+    def histogram(self, name, help, labels=(), buckets=DEFAULT_BUCKETS):
+        return self.add(Histogram(self, name, help, labels, buckets))
+
+    def add(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def collector(self, name, collect):
+        """Register (or replace, on restart) a callable exposing stats() style counters as gauges"""
+        self.collectors[name] = collect
+
+    def render(self):
+        """Everything in the Prometheus text exposition format"""
+        lines = []
+        with self.lock:
+            for metric in self.metrics:
+                lines += metric.header() + metric.render()
+
+        for name, collect in list(self.collectors.items()):
+            try:
+                stats = collect()
+            except Exception:
+                continue
+            for stat, value in stats.items():
+                metric_name = f"ticker_bot_{name}_{stat}"
+                lines += [f"# TYPE {metric_name} gauge", f"{metric_name} {float(value)}"]
+
+        return "\n".join(lines) + "\n"
+
+METRICS = Registry()
+
+STAGE_SECONDS = METRICS.histogram(
+    "ticker_bot_stage_seconds", "Time spent in each command stage", ("command", "stage"))
+COMMANDS_IN_FLIGHT = METRICS.gauge(
+    "ticker_bot_commands_in_flight", "Commands currently being handled", ("command",))
+UPSTREAM_SECONDS = METRICS.histogram(
+    "ticker_bot_upstream_seconds", "Vestige request latency per attempt", ("endpoint", "status"))
+UPSTREAM_WAIT_SECONDS = METRICS.histogram(
+    "ticker_bot_upstream_wait_seconds", "Time spent waiting on the Vestige rate limiter", ("priority",))
+UPSTREAM_IN_FLIGHT = METRICS.gauge(
+    "ticker_bot_upstream_in_flight", "Vestige requests currently in flight")
+INFO_RESPONSES = METRICS.counter(
+    "ticker_bot_info_responses_total", "/info responses by how fresh the data was, and what their revalidation did", ("result",))
+STARTUP_SECONDS = METRICS.gauge(
+    "ticker_bot_startup_seconds", "Seconds from process start (or restart) to each startup phase", ("phase",))
@@ -1,15 +1,51 @@
+import asyncio
+
 from src.loader import load_the_bot
+from src.startup import STARTUP
+
+# Startup work that doesn't hold up the ready state, kept until it finishes
+background = set()
+
+def in_background(coro):
+    task = asyncio.create_task(coro)
+    background.add(task)
+    task.add_done_callback(background.discard)
+    return task
+
+async def sync_commands(self, tree):
+    try:
+        await tree.sync()
+        STARTUP.mark("commands_synced")
+        print("Commands Synced")
+    except Exception as e:
+        # Try again on the next on_ready, the commands Discord already has keep working meanwhile
+        self.synced = False
+        print(f"✗ ERROR syncing commands: {e}", flush=True)
+
+async def warm_renderer(bot):
+    try:
+        await bot.renderer.warm()
+        STARTUP.mark("renderer_warm")
+    except Exception as e:
+        print(f"✗ ERROR warming the renderer: {e}", flush=True)
 
 async def on_ready(self, tree, bot, management_channel):
     await self.wait_until_ready()
-    # Check if slash commands have been synced
+    STARTUP.mark("gateway_ready")
+    # Check if slash commands have been synced, the registered ones serve until it's done
     if not self.synced:
-        await tree.sync()
         self.synced = True
+        in_background(sync_commands(self, tree))
         print("Commands Syncing...")
 
     # Lock bot until ready for users
     bot.locked = True
+
+    # Alerts post through the client outside of any command
+    bot.client = self
+
+    # Warm up the shared Vestige connection pool
+    await bot.vestige.start()
     
     # Set up management channel if provided
     if management_channel:
@@ -28,3 +64,12 @@ async def on_ready(self, tree, bot, management_channel):
     
     # Bot loaded with data, release lock
     bot.locked = False
+    print(f"Ready {STARTUP.mark('ready'):.2f}s after start", flush=True)
+
+    # Chart backend imports happen off the boot path, before the first /info needs them
+    in_background(warm_renderer(bot))
+
+    if STARTUP.exit_when_ready:
+        await asyncio.gather(*background, return_exceptions=True)
+        print(STARTUP.report(), flush=True)
+        await self.close()
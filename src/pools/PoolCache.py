@@ -0,0 +1,100 @@
+import asyncio, time
+from collections import OrderedDict
+
+from consts import NETWORK_ID, POOLS_PAGE_SIZE, POOLS_TTL, POOLS_CACHE_ENTRIES
+
+# Sort choice -> (Vestige order_by, order_dir)
+SORTS = {
+    "tvl": ("tvl", "desc"),
+    "volume": ("volume_24h", "desc"),
+    "fee": ("fee_tier", "asc")
+}
+
+class PoolSnapshot:
+    __slots__ = ("pools", "exhausted", "fetched_at", "lock")
+
+    def __init__(self, now):
+        # Pools in server order, only as far as someone has paged
+        self.pools = []
+        self.exhausted = False
+        self.fetched_at = now
+        self.lock = asyncio.Lock()
+
+class PoolCache:
+    """Per-(asset, sort) pool listings, fetched from Vestige a page at a time.
+
+    Each page asks the API for just the rows past what's already cached (plus
+    one to know if there's a next page), so flipping back and forth is served
+    from memory. Listings expire after `ttl` and the least recently used go
+    past `max_entries`.
+    """
+    def __init__(self, vestige, page_size=POOLS_PAGE_SIZE, ttl=POOLS_TTL, max_entries=POOLS_CACHE_ENTRIES):
+        self.vestige = vestige
+        self.page_size = page_size
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.fetches = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def snapshot(self, asset_id, sort):
+        key = (asset_id, sort)
+        now = time.time()
+        snapshot = self.entries.get(key)
+        if snapshot is None or now - snapshot.fetched_at > self.ttl:
+            snapshot = PoolSnapshot(now)
+            self.entries[key] = snapshot
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return snapshot
+
+    async def page(self, asset_id=None, sort="tvl", page=0):
+        """(status, pools on the page, whether there's a next page)"""
+        snapshot = self.snapshot(asset_id, sort)
+        start = page * self.page_size
+        # One past the page tells us whether there's another
+        end = start + self.page_size + 1
+
+        async with snapshot.lock:
+            if len(snapshot.pools) >= end or snapshot.exhausted:
+                self.hits += 1
+            else:
+                wanted = end - len(snapshot.pools)
+                status, rows = await self.fetch(asset_id, sort, len(snapshot.pools), wanted)
+                if status != 200:
+                    return status, None, False
+                snapshot.pools += rows
+                snapshot.exhausted = len(rows) < wanted
+
+        pools = snapshot.pools[start:start + self.page_size]
+        return 200, pools, len(snapshot.pools) > start + self.page_size
+
+    async def fetch(self, asset_id, sort, offset, limit):
+        order_by, order_dir = SORTS[sort]
+        params = {
+            "network_id": NETWORK_ID,
+            "limit": limit,
+            "offset": offset,
+            "order_by": order_by,
+            "order_dir": order_dir
+        }
+        if asset_id:
+            params["asset_id"] = asset_id
+
+        self.fetches += 1
+        status, data = await self.vestige.get_shared("/pools", params=params)
+        if status != 200:
+            return status, None
+        return status, data.get("pools", []) if isinstance(data, dict) else data
+
+    def stats(self):
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "fetches": self.fetches
+        }
@@ -0,0 +1,102 @@
+import discord
+
+from src.pools.PoolCache import SORTS
+from src.pools.utils import get_pools
+from src.metrics import STAGE_SECONDS
+from src.vestige.rate_limiter import Priority, set_priority
+
+SORT_LABELS = {
+    "tvl": "TVL",
+    "volume": "Volume 24h",
+    "fee": "Fee"
+}
+
+class PoolsView(discord.ui.View):
+    def __init__(self, message, bot, asset_id, sort, page, has_next, timeout):
+        super().__init__(timeout=timeout)
+        self.message = message
+        self.bot = bot
+        self.asset_id = asset_id
+        self.sort = sort
+        self.page = page
+
+        self.add_page_button("◀ Prev", page - 1, disabled=page == 0)
+        self.add_page_button("Next ▶", page + 1, disabled=not has_next)
+        for sort_choice in SORTS:
+            if sort_choice != sort:
+                self.add_sort_button(sort_choice)
+
+    def add_page_button(self, label, page, disabled):
+        button = discord.ui.Button(
+            label=label,
+            style=discord.ButtonStyle.secondary,
+            custom_id=f"pools_page_{page}",
+            disabled=disabled
+        )
+
+        async def btn_callback(interaction):
+            await self.show(interaction, self.sort, page)
+
+        button.callback = btn_callback
+        self.add_item(button)
+
+    def add_sort_button(self, sort):
+        button = discord.ui.Button(
+            label=f"Sort by {SORT_LABELS[sort]}",
+            style=discord.ButtonStyle.primary,
+            custom_id=f"pools_sort_{sort}"
+        )
+
+        async def btn_callback(interaction):
+            # A new sort starts from the first page
+            await self.show(interaction, sort, 0)
+
+        button.callback = btn_callback
+        self.add_item(button)
+
+    async def show(self, interaction, sort, page):
+        set_priority(Priority.BUTTON)
+        await interaction.response.defer()
+        with STAGE_SECONDS.time(command="pools", stage="page"):
+            result = await get_pools(interaction, self.bot, self.asset_id, sort, page)
+        if result is None:
+            # The page stays up with its buttons, only the clicker hears about it and can try again
+            await interaction.followup.send("❌ Could not fetch pool data. Please try again.", ephemeral=True)
+            return
+        self.stop()
+        pools, has_next = result
+        await pools_ui(interaction, self.bot, self.asset_id, sort, page, pools, has_next)
+
+    async def interaction_check(self, interaction: discord.Interaction):
+        return interaction.user.id == self.message.user.id
+
+    async def on_timeout(self):
+        await self.message.edit_original_response(view=None)
+
+async def pools_ui(interaction, bot, asset_id, sort, page, pools, has_next):
+    page_size = bot.pools.page_size
+    first = page * page_size + 1
+
+    # Create embed with pool information
+    embed = discord.Embed(
+        title="Liquidity Pools",
+        color=discord.Color.green(),
+        description=f"Showing pools {first}-{first + len(pools) - 1}, sorted by {SORT_LABELS[sort]}"
+    )
+
+    for i, pool in enumerate(pools, first):
+        pool_info = f"**TVL:** ${float(pool.get('tvl', 0)):,.2f}\n"
+        pool_info += f"**Volume 24h:** ${float(pool.get('volume_24h', 0)):,.2f}\n"
+        pool_info += f"**Fee:** {pool.get('fee_tier', 'N/A')}%"
+
+        embed.add_field(
+            name=f"{i}. Pool {pool.get('pool_id', 'Unknown')[:8]}",
+            value=pool_info,
+            inline=False
+        )
+    embed.set_footer(text=f"Page {page + 1}")
+
+    view = PoolsView(interaction, bot, asset_id, sort, page, has_next, 120)
+
+    with STAGE_SECONDS.time(command="pools", stage="edit"):
+        await interaction.edit_original_response(embed=embed, view=view)
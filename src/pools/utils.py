@@ -0,0 +1,14 @@
+from src.logger import notify_admin
+
+async def get_pools(interaction, bot, asset_id: int = None, sort: str = "tvl", page: int = 0):
+    """One page of liquidity pools from the pool cache, (pools, has_next) or None on error"""
+    try:
+        status, pools, has_next = await bot.pools.page(asset_id, sort, page)
+        if status == 200:
+            return pools, has_next
+        else:
+            await notify_admin(interaction, bot, f"error fetching pools :: {status}")
+            return None
+    except Exception as e:
+        await notify_admin(interaction, bot, f"error in pool fetch: {str(e)}")
+        return None
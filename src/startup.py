@@ -0,0 +1,68 @@
+import os, sys, time
+
+from src.metrics import STARTUP_SECONDS
+
+# Imported on first use or warmed in the background, none should be loaded by the time we're ready
+HEAVY_MODULES = ("matplotlib", "numpy", "PIL")
+
+def process_age():
+    """Seconds since this process was started, 0 where /proc isn't there.
+
+    The bot is the container's only process, so this is also the time since
+    the container started, interpreter startup included.
+    """
+    try:
+        with open("/proc/self/stat") as f:
+            # The command name can hold spaces, fields are counted after its closing paren
+            started = int(f.read().rsplit(")", 1)[1].split()[19]) / os.sysconf("SC_CLK_TCK")
+        with open("/proc/uptime") as f:
+            uptime = float(f.read().split()[0])
+        return max(0.0, uptime - started)
+    except (OSError, ValueError, IndexError):
+        return 0.0
+
+class StartupProfile:
+    """Wall time to each startup phase, on /metrics and as a report for --profile-startup.
+
+    The first boot is timed from process start, a restart of the bot loop from
+    its `begin`. Phases run in the background (command sync, renderer warm-up)
+    are marked whenever they finish, they don't hold up `ready`.
+    """
+    def __init__(self):
+        self.origin = time.monotonic() - process_age()
+        self.phases = {}
+        self.heavy_at_ready = None
+        self.restarts = 0
+        # Set by main.py --profile-startup, stops the bot after the report
+        self.exit_when_ready = False
+
+    def begin(self):
+        """Start of a bot loop iteration, restarts are timed from here"""
+        if self.phases:
+            self.origin = time.monotonic()
+            self.phases = {}
+            self.heavy_at_ready = None
+            self.restarts += 1
+
+    def mark(self, phase):
+        elapsed = time.monotonic() - self.origin
+        self.phases[phase] = elapsed
+        STARTUP_SECONDS.set(elapsed, phase=phase)
+        if phase == "ready":
+            self.heavy_at_ready = [name for name in HEAVY_MODULES if name in sys.modules]
+        return elapsed
+
+    def report(self):
+        start = "restart" if self.restarts else "process start"
+        lines = [f"startup profile, seconds since {start}:"]
+        previous = 0.0
+        for phase, elapsed in sorted(self.phases.items(), key=lambda item: item[1]):
+            lines.append(f"  {phase:<20} {elapsed:8.3f}  (+{elapsed - previous:.3f})")
+            previous = elapsed
+        if self.heavy_at_ready is not None:
+            lines.append(f"  heavy modules loaded before ready: {', '.join(self.heavy_at_ready) or 'none'}")
+        if "importtime" not in sys._xoptions and not os.environ.get("PYTHONPROFILEIMPORTTIME"):
+            lines.append("  run with python -X importtime for a per-module import breakdown")
+        return "\n".join(lines)
+
+STARTUP = StartupProfile()
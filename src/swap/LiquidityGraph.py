@@ -0,0 +1,139 @@
+from itertools import islice
+from typing import NamedTuple
+
+class Pool:
+    """Constant-product pool, fee as a fraction.
+
+    Reserves are taken as /pools reports them and assumed to be in the units
+    of /swap amounts. Nothing here scales by asset decimals, RouteEngine only
+    quotes a pair locally after /swap/routes has confirmed that for it.
+    """
+    __slots__ = ("pool_id", "asset_a", "asset_b", "reserve_a", "reserve_b", "fee", "tvl")
+
+    def __init__(self, pool_id, asset_a, asset_b, reserve_a, reserve_b, fee, tvl=0.0):
+        self.pool_id = pool_id
+        self.asset_a = asset_a
+        self.asset_b = asset_b
+        self.reserve_a = reserve_a
+        self.reserve_b = reserve_b
+        self.fee = fee
+        self.tvl = tvl
+
+    @classmethod
+    def from_json(cls, row):
+        """Pool from a Vestige /pools row, None if it's missing what routing needs"""
+        try:
+            pool = cls(
+                row["pool_id"],
+                int(row["asset_1_id"]), int(row["asset_2_id"]),
+                float(row["asset_1_reserves"]), float(row["asset_2_reserves"]),
+                # fee_tier is a percentage, 0.3 means 0.3%
+                float(row.get("fee_tier") or 0) / 100,
+                float(row.get("tvl") or 0)
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+        if pool.reserve_a <= 0 or pool.reserve_b <= 0 or pool.asset_a == pool.asset_b:
+            return None
+        return pool
+
+    def reserves(self, asset_in):
+        """(reserve in, reserve out) when swapping `asset_in` into the pool"""
+        if asset_in == self.asset_a:
+            return self.reserve_a, self.reserve_b
+        return self.reserve_b, self.reserve_a
+
+    def output(self, asset_in, amount):
+        reserve_in, reserve_out = self.reserves(asset_in)
+        amount_after_fee = amount * (1 - self.fee)
+        return reserve_out * amount_after_fee / (reserve_in + amount_after_fee)
+
+    def spot(self, asset_in):
+        """Output per unit for an infinitely small swap, fee included"""
+        reserve_in, reserve_out = self.reserves(asset_in)
+        return reserve_out / reserve_in * (1 - self.fee)
+
+class Route(NamedTuple):
+    output_amount: float
+    # Percent lost to the pools' curves on top of their fees
+    price_impact: float
+    pools: tuple
+    path: tuple
+
+    def to_json(self):
+        """Same shape as a /swap/routes route, the embed reads either"""
+        return {
+            "output_amount": self.output_amount,
+            "price_impact": self.price_impact,
+            "hops": [{"pool_id": pool_id} for pool_id in self.pools]
+        }
+
+class LiquidityGraph:
+    """Assets as nodes, pools as edges, searched for the best route of up to `max_hops`.
+
+    Only the `fanout` most liquid neighbours of each asset are expanded (the
+    target is always tried when it's a neighbour), which keeps a three hop
+    search to a few hundred paths. Between two assets the pool giving the
+    most output for the amount at that hop is used.
+    """
+    def __init__(self, pools=(), max_hops=3, fanout=8):
+        self.max_hops = max_hops
+        self.fanout = fanout
+        # asset -> neighbour -> [pools], neighbours ordered by their biggest pool's TVL
+        self.adjacency = {}
+        self.size = 0
+
+        for pool in pools:
+            self.add(pool)
+        for neighbours in self.adjacency.values():
+            ordered = sorted(neighbours.items(), key=lambda item: -max(pool.tvl for pool in item[1]))
+            neighbours.clear()
+            neighbours.update(ordered)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, pool: Pool):
+        self.adjacency.setdefault(pool.asset_a, {}).setdefault(pool.asset_b, []).append(pool)
+        self.adjacency.setdefault(pool.asset_b, {}).setdefault(pool.asset_a, []).append(pool)
+        self.size += 1
+
+    def best_hop(self, asset_in, asset_out, amount):
+        best = None
+        for pool in self.adjacency[asset_in][asset_out]:
+            output = pool.output(asset_in, amount)
+            if best is None or output > best[0]:
+                best = (output, pool)
+        return best
+
+    def quote(self, asset_in, asset_out, amount):
+        """Best Route for swapping `amount` of asset_in, None if the graph doesn't connect them"""
+        if asset_in == asset_out or asset_in not in self.adjacency or amount <= 0:
+            return None
+
+        best = None
+        # (asset, amount held, pools so far, assets so far, spot output so far)
+        stack = [(asset_in, amount, (), (asset_in,), amount)]
+        while stack:
+            asset, held, pools, path, ideal = stack.pop()
+            neighbours = self.adjacency[asset]
+
+            candidates = list(islice(neighbours, self.fanout))
+            if asset_out in neighbours and asset_out not in candidates:
+                candidates.append(asset_out)
+
+            for neighbour in candidates:
+                if neighbour in path:
+                    continue
+                output, pool = self.best_hop(asset, neighbour, held)
+                hop_pools = pools + (pool.pool_id,)
+                hop_path = path + (neighbour,)
+                hop_ideal = ideal * pool.spot(asset)
+
+                if neighbour == asset_out:
+                    if best is None or output > best.output_amount:
+                        impact = (1 - output / hop_ideal) * 100 if hop_ideal > 0 else 0.0
+                        best = Route(output, impact, hop_pools, hop_path)
+                elif len(hop_pools) < self.max_hops:
+                    stack.append((neighbour, output, hop_pools, hop_path, hop_ideal))
+        return best
@@ -0,0 +1,187 @@
+import asyncio, logging, random, time
+
+from src.swap.LiquidityGraph import LiquidityGraph, Pool
+from consts import (
+    NETWORK_ID, SWAP_GRAPH_POOLS, SWAP_GRAPH_REFRESH, SWAP_MAX_HOPS, SWAP_FANOUT,
+    SWAP_CROSS_CHECK_RATE, SWAP_MAX_DEVIATION, SWAP_DISTRUST_TTL
+)
+from src.vestige.rate_limiter import Priority, set_priority
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 250
+
+class RouteEngine:
+    """Swap quotes from a liquidity graph of the most liquid pools, rebuilt in the background.
+
+    Nothing checks that pool reserves and swap amounts share units (decimals),
+    so a pair is only quoted locally once /swap/routes has agreed with the
+    graph for it. Its first quote goes remote and is compared on the way.
+    After that a sample of local quotes is also asked of /swap/routes in the
+    background. A pair whose quotes disagree by more than `max_deviation` is
+    answered remotely for `distrust_ttl` and has to be verified again, as is
+    anything the graph can't route or anything asked while the graph is older
+    than a few refreshes.
+    """
+    def __init__(self, vestige, max_pools=SWAP_GRAPH_POOLS, interval=SWAP_GRAPH_REFRESH, max_hops=SWAP_MAX_HOPS,
+                 fanout=SWAP_FANOUT, check_rate=SWAP_CROSS_CHECK_RATE, max_deviation=SWAP_MAX_DEVIATION,
+                 distrust_ttl=SWAP_DISTRUST_TTL):
+        self.vestige = vestige
+        self.max_pools = max_pools
+        self.interval = interval
+        self.max_hops = max_hops
+        self.fanout = fanout
+        self.check_rate = check_rate
+        self.max_deviation = max_deviation
+        self.distrust_ttl = distrust_ttl
+
+        self.graph = LiquidityGraph(max_hops=max_hops, fanout=fanout)
+        self.updated_at = None
+        # (asset_in, asset_out) -> monotonic time the pair can be quoted locally again
+        self.distrusted = {}
+        # (asset_in, asset_out) pairs /swap/routes has agreed with the graph on
+        self.verified = set()
+        self.checks = set()
+        self.task = None
+
+        self.local = 0
+        self.remote_quotes = 0
+        self.cross_checks = 0
+        self.mismatches = 0
+
+    def stats(self):
+        return {
+            "pools": len(self.graph),
+            "local": self.local,
+            "remote": self.remote_quotes,
+            "cross_checks": self.cross_checks,
+            "mismatches": self.mismatches,
+            "distrusted_pairs": len(self.distrusted),
+            "verified_pairs": len(self.verified)
+        }
+
+    def start(self):
+        """Build the graph in the background, safe to call on every on_ready"""
+        if self.task and not self.task.done():
+            return
+        self.task = asyncio.create_task(self.refresh_forever())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        for task in list(self.checks):
+            task.cancel()
+
+    async def refresh_forever(self):
+        set_priority(Priority.BACKGROUND)
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"liquidity graph refresh failed :: {e}", extra={"user": "routes", "id": "-"})
+            await asyncio.sleep(self.interval)
+
+    async def refresh(self):
+        pools = []
+        offset = 0
+        while offset < self.max_pools:
+            limit = min(PAGE_SIZE, self.max_pools - offset)
+            params = {
+                "network_id": NETWORK_ID,
+                "limit": limit,
+                "offset": offset,
+                "order_by": "tvl",
+                "order_dir": "desc"
+            }
+            status, data = await self.vestige.get("/pools", params=params)
+            if status != 200:
+                logger.warning(f"liquidity graph page {offset} failed :: {status}", extra={"user": "routes", "id": "-"})
+                return False
+            rows = data.get("pools", []) if isinstance(data, dict) else data
+            pools += filter(None, (Pool.from_json(row) for row in rows))
+            offset += limit
+            if len(rows) < limit:
+                break
+
+        # Built aside and swapped in, quotes never see a half built graph
+        self.graph = LiquidityGraph(pools, self.max_hops, self.fanout)
+        self.updated_at = time.monotonic()
+        return True
+
+    @property
+    def stale(self):
+        return self.updated_at is None or time.monotonic() - self.updated_at > 3 * self.interval
+
+    def trusted(self, asset_in, asset_out):
+        until = self.distrusted.get((asset_in, asset_out))
+        if until is None:
+            return True
+        if time.monotonic() >= until:
+            del self.distrusted[(asset_in, asset_out)]
+            return True
+        return False
+
+    def quote(self, asset_in, asset_out, amount):
+        """Local Route for the swap, None when it should go to /swap/routes instead"""
+        if self.stale or (asset_in, asset_out) not in self.verified or not self.trusted(asset_in, asset_out):
+            return None
+        route = self.graph.quote(asset_in, asset_out, amount)
+        if route is None:
+            return None
+
+        self.local += 1
+        if random.random() < self.check_rate:
+            task = asyncio.create_task(self.cross_check(asset_in, asset_out, amount, route))
+            self.checks.add(task)
+            task.add_done_callback(self.checks.discard)
+        return route
+
+    async def remote(self, asset_in, asset_out, amount):
+        """(status, json) from /swap/routes"""
+        params = {
+            "asset_in": asset_in,
+            "asset_out": asset_out,
+            "amount": amount,
+            "network_id": NETWORK_ID
+        }
+        self.remote_quotes += 1
+        status, data = await self.vestige.get_shared("/swap/routes", params=params)
+
+        # An unverified pair gets its local quote compared with the answer, a match lets it quote
+        # locally. A distrusted one waits out its distrust_ttl first
+        if (asset_in, asset_out) not in self.verified and not self.stale and self.trusted(asset_in, asset_out):
+            route = self.graph.quote(asset_in, asset_out, amount)
+            if route is not None:
+                self.compare(asset_in, asset_out, route, status, data)
+        return status, data
+
+    async def cross_check(self, asset_in, asset_out, amount, route):
+        set_priority(Priority.BACKGROUND)
+        try:
+            status, data = await self.remote(asset_in, asset_out, amount)
+        except Exception as e:
+            logger.warning(f"swap cross-check failed :: {e}", extra={"user": "routes", "id": "-"})
+            return
+        self.compare(asset_in, asset_out, route, status, data)
+
+    def compare(self, asset_in, asset_out, route, status, data):
+        """Trust or distrust the pair on how far the local route is from a /swap/routes answer"""
+        routes = data.get("routes") if status == 200 and data else None
+        if not routes:
+            return
+
+        self.cross_checks += 1
+        expected = float(routes[0].get("output_amount") or 0)
+        if expected <= 0:
+            return
+        deviation = abs(route.output_amount - expected) / expected
+        if deviation <= self.max_deviation:
+            self.verified.add((asset_in, asset_out))
+        else:
+            self.mismatches += 1
+            self.verified.discard((asset_in, asset_out))
+            self.distrusted[(asset_in, asset_out)] = time.monotonic() + self.distrust_ttl
+            logger.warning(
+                f"local quote {asset_in}->{asset_out} off by {deviation:.2%}, quoting remotely for now",
+                extra={"user": "routes", "id": "-"})
@@ -1,44 +1,38 @@
 import discord
-import aiohttp
-from consts import HEADERS, NETWORK_ID
 from src.logger import notify_bot, notify_admin
+from src.metrics import STAGE_SECONDS
 
 async def get_swap_routes(interaction, bot, asset_in: int, asset_out: int, amount: float):
     """Fetch swap routes from Vestige Labs API"""
     try:
-        url = f"https://api.vestigelabs.org/swap/routes"
-        params = {
-            "asset_in": asset_in,
-            "asset_out": asset_out,
-            "amount": amount,
-            "network_id": NETWORK_ID
-        }
-        
-        conn = aiohttp.TCPConnector(limit=None, ttl_dns_cache=300)
-        session = aiohttp.ClientSession(connector=conn)
-        async with session.get(url=url, params=params, headers=HEADERS) as response:
-            if response.status == 200:
-                routes = await response.json()
-                await session.close()
-                return routes
-            else:
-                await notify_admin(interaction, bot, f"error fetching swap routes :: {response}")
-                await session.close()
-                return None
+        status, routes = await bot.routes.remote(asset_in, asset_out, amount)
+        if status == 200:
+            return routes
+        else:
+            await notify_admin(interaction, bot, f"error fetching swap routes :: {status}")
+            return None
     except Exception as e:
         await notify_admin(interaction, bot, f"error in swap routes: {str(e)}")
         return None
 
 async def swap_workflow(interaction: discord.Interaction, bot, asset_in: int, asset_out: int, amount: float):
     """Handle swap command workflow"""
-    routes = await get_swap_routes(interaction, bot, asset_in, asset_out, amount)
-    
-    if not routes:
-        await interaction.followup.send("❌ Could not fetch swap routes. Please try again.")
-        return
+    # Cached pool reserves answer most quotes, /swap/routes covers whatever they can't
+    with STAGE_SECONDS.time(command="swap", stage="quote"):
+        local_route = bot.routes.quote(asset_in, asset_out, amount)
     
-    # Extract best route (usually first one)
-    best_route = routes.get("routes", [])[0] if routes.get("routes") else None
+    if local_route:
+        best_route = local_route.to_json()
+    else:
+        with STAGE_SECONDS.time(command="swap", stage="fetch"):
+            routes = await get_swap_routes(interaction, bot, asset_in, asset_out, amount)
+        
+        if not routes:
+            await interaction.followup.send("❌ Could not fetch swap routes. Please try again.")
+            return
+        
+        # Extract best route (usually first one)
+        best_route = routes.get("routes", [])[0] if routes.get("routes") else None
     
     if not best_route:
         await interaction.followup.send("❌ No swap routes available for this pair.")
@@ -69,4 +63,8 @@ async def swap_workflow(interaction: discord.Interaction, bot, asset_in: int, as
         inline=True
     )
     
-    await interaction.followup.send(embed=embed)
+    if local_route:
+        embed.set_footer(text="Quoted from cached pool reserves")
+    
+    with STAGE_SECONDS.time(command="swap", stage="edit"):
+        await interaction.followup.send(embed=embed)
@@ -0,0 +1,108 @@
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+HOUR = 3600
+DAY = 24 * HOUR
+WEEK = 7 * DAY
+
+class CandleSeries:
+    """Column-oriented OHLC candles, sorted by timestamp.
+
+    Windowed queries binary search the timestamp column for the window start
+    and reduce over the matching suffix, so any window inside the fetched
+    range (1h, 24h, 7d...) is answered without another API call.
+    """
+    def __init__(self, candles=(), interval=None):
+        # Candle width in seconds, None when unknown
+        self.interval = interval
+
+        self.timestamps = array("q")
+        self.open = array("d")
+        self.high = array("d")
+        self.low = array("d")
+        self.close = array("d")
+
+        self.merge(candles)
+
+    def append(self, timestamp, candle):
+        self.timestamps.append(timestamp)
+        self.open.append(float(candle["open"]))
+        self.high.append(float(candle["high"]))
+        self.low.append(float(candle["low"]))
+        self.close.append(float(candle["close"]))
+
+    def columns(self):
+        return (self.timestamps, self.open, self.high, self.low, self.close)
+
+    def pop(self):
+        for column in self.columns():
+            column.pop()
+
+    def merge(self, candles):
+        """Fold newer candles in, the ones they overlap (e.g. the still-open bucket) are replaced"""
+        candles = sorted(candles, key=lambda x: x["timestamp"])
+        if not candles:
+            return
+        cut = bisect_left(self.timestamps, int(candles[0]["timestamp"]))
+        for column in self.columns():
+            del column[cut:]
+
+        last_timestamp = self.last_timestamp
+        for candle in candles:
+            timestamp = int(candle["timestamp"])
+            # Drop duplicated buckets, the API can repeat the boundary candle
+            if timestamp == last_timestamp:
+                self.pop()
+            self.append(timestamp, candle)
+            last_timestamp = timestamp
+
+    def trim(self, before):
+        """Drop candles starting before the `before` timestamp"""
+        cut = bisect_left(self.timestamps, before)
+        for column in self.columns():
+            del column[:cut]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __bool__(self):
+        return len(self.timestamps) > 0
+
+    @property
+    def first_timestamp(self):
+        return self.timestamps[0] if self.timestamps else None
+
+    @property
+    def last_timestamp(self):
+        return self.timestamps[-1] if self.timestamps else None
+
+    def window(self, seconds=None, now=None, end=None):
+        """Index range [lo, hi) of candles starting in the last `seconds` before `now`.
+
+        `end` optionally caps the window to candles starting before that timestamp.
+        """
+        lo = 0
+        if seconds is not None:
+            now = int(time.time()) if now is None else now
+            lo = bisect_left(self.timestamps, now - seconds)
+        hi = len(self.timestamps) if end is None else bisect_right(self.timestamps, end)
+        return lo, max(lo, hi)
+
+    def high_low(self, seconds=None, now=None):
+        """Highest high and lowest low in the window, None when it's empty"""
+        lo, hi = self.window(seconds, now)
+        if lo == hi:
+            return None
+        return max(self.high[lo:hi]), min(self.low[lo:hi])
+
+    def last_close(self, seconds=None, now=None):
+        lo, hi = self.window(seconds, now)
+        if lo == hi:
+            return None
+        return self.close[hi - 1]
+
+    def points(self, seconds=None, now=None):
+        """(timestamps, closes) for the window, what the graph renders"""
+        lo, hi = self.window(seconds, now)
+        return self.timestamps[lo:hi], self.close[lo:hi]
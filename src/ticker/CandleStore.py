@@ -0,0 +1,155 @@
+import time
+from collections import OrderedDict
+
+from src.ticker.CandleSeries import CandleSeries
+from consts import NETWORK_ID, CANDLE_RETENTION, CANDLE_STORE_ASSETS, CANDLE_FRESHNESS
+
+def candle_interval(token, now=None):
+    """Candle width for the token, younger tokens get finer candles"""
+    now = int(time.time()) if now is None else now
+    age = now - token.creation_timestamp
+
+    if age <= 1800:     # 30 mins
+        return 30
+    elif age <= 3600:   # 1 hour
+        return 60
+    elif age <= 86400:  # 1 day
+        return 300
+    else:
+        return 7200
+
+def window_start(interval, seconds, now=None):
+    """Start of a window snapped to the candle grid, so lookups inside one interval share it"""
+    now = int(time.time()) if now is None else now
+    start = now - seconds
+    return start - start % interval
+
+class StoredSeries:
+    __slots__ = ("series", "covered_from", "fetched_at", "retention")
+
+    def __init__(self, series, covered_from, fetched_at, retention):
+        self.series = series
+        # Earliest start we fetched from, older windows need a full fetch
+        self.covered_from = covered_from
+        self.fetched_at = fetched_at
+        self.retention = retention
+
+class CandleStore:
+    """Per-asset candle series kept in memory and topped up with deltas.
+
+    The first lookup for an (asset, interval) fetches the whole window, later
+    ones only ask for candles from the last stored timestamp on. Candles older
+    than the retention window are dropped and the least recently used assets
+    are evicted past `max_assets`.
+    """
+    def __init__(self, vestige, disk=None, retention=CANDLE_RETENTION, max_assets=CANDLE_STORE_ASSETS, freshness=CANDLE_FRESHNESS):
+        self.vestige = vestige
+        # Optional DiskCache, series evicted or lost to a restart come back from there
+        self.disk = disk
+        self.retention = retention
+        self.max_assets = max_assets
+        self.freshness = freshness
+        self.entries = OrderedDict()
+
+        self.full_fetches = 0
+        self.delta_fetches = 0
+        self.fresh_hits = 0
+        self.disk_hits = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    async def cached(self, asset_id, interval, start):
+        """(series, age in seconds) covering `start` without fetching, (None, None) if we have none"""
+        key = (asset_id, interval)
+        now = int(time.time())
+        entry = self.entries.get(key)
+        if entry is None and self.disk:
+            entry = await self.restore(asset_id, interval, now)
+        if not entry or entry.covered_from > start or not entry.series:
+            return None, None
+        self.entries.move_to_end(key)
+        return entry.series, now - entry.fetched_at
+
+    async def get(self, asset_id, interval, start):
+        """(status, series) covering `start` up to now, series is None only when nothing is stored.
+
+        A failed delta still hands back the stored series so callers can show it.
+        """
+        key = (asset_id, interval)
+        now = int(time.time())
+        entry = self.entries.get(key)
+        if entry is None and self.disk:
+            entry = await self.restore(asset_id, interval, now)
+
+        if entry and entry.covered_from <= start and entry.series:
+            self.entries.move_to_end(key)
+            if now - entry.fetched_at < self.freshness:
+                self.fresh_hits += 1
+                return 200, entry.series
+            # Re-fetch the newest bucket too, it was still open last time
+            status, candles = await self.fetch(asset_id, interval, entry.series.last_timestamp)
+            self.delta_fetches += 1
+            if status == 200:
+                entry.series.merge(candles or ())
+                entry.fetched_at = now
+                self.trim(entry, now)
+                if self.disk:
+                    self.disk.save_candles(asset_id, interval, candles or (), entry.covered_from, now)
+            return status, entry.series
+
+        status, candles = await self.fetch(asset_id, interval, start)
+        self.full_fetches += 1
+        if status != 200 or not candles:
+            return status, entry.series if entry else None
+
+        # Windows longer than the retention keep what they asked for
+        entry = StoredSeries(CandleSeries(candles, interval), start, now, max(self.retention, now - start))
+        self.trim(entry, now)
+        self.remember(key, entry)
+        if self.disk:
+            self.disk.save_candles(asset_id, interval, candles, entry.covered_from, now, replace=True)
+        return status, entry.series
+
+    def remember(self, key, entry):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_assets:
+            self.entries.popitem(last=False)
+
+    async def restore(self, asset_id, interval, now):
+        """Series from the disk cache, it goes through the normal delta path afterwards"""
+        stored = await self.disk.load_candles(asset_id, interval)
+        if not stored:
+            return None
+        candles, covered_from, fetched_at = stored
+        entry = StoredSeries(CandleSeries(candles, interval), covered_from, fetched_at, max(self.retention, now - covered_from))
+        self.trim(entry, now)
+        self.remember((asset_id, interval), entry)
+        self.disk_hits += 1
+        return entry
+
+    def trim(self, entry, now):
+        oldest = now - entry.retention - (entry.series.interval or 0)
+        if entry.covered_from < oldest:
+            entry.series.trim(oldest)
+            entry.covered_from = oldest
+
+    async def fetch(self, asset_id, interval, start):
+        params = {
+            "network_id": NETWORK_ID,
+            "interval": interval,
+            "start": start,
+            "denominating_asset_id": 0,
+            "volume_in_denominating_asset": "false"
+        }
+        return await self.vestige.get_shared(f"/assets/{asset_id}/candles", params=params)
+
+    def stats(self):
+        return {
+            "assets": len(self.entries),
+            "full_fetches": self.full_fetches,
+            "delta_fetches": self.delta_fetches,
+            "fresh_hits": self.fresh_hits,
+            "disk_hits": self.disk_hits
+        }
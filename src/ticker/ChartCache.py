@@ -0,0 +1,52 @@
+from collections import OrderedDict
+
+class ChartCache:
+    """LRU of rendered chart bytes bounded by total size.
+
+    Keys are (asset_id, window, interval, last candle timestamp, style), so a
+    chart is reused until a new candle closes for that asset.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        png = self.entries.get(key)
+        if png is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return png
+
+    def put(self, key, png: bytes):
+        # Larger than the whole budget, never worth keeping
+        if len(png) > self.max_bytes:
+            return
+        previous = self.entries.pop(key, None)
+        if previous is not None:
+            self.size -= len(previous)
+
+        self.entries[key] = png
+        self.size += len(png)
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.entries),
+            "bytes": self.size
+        }
@@ -0,0 +1,179 @@
+import asyncio, logging, time
+from collections import OrderedDict
+
+from consts import LIVE_INTERVAL, LIVE_MAX_DURATION, LIVE_MAX_MESSAGES, LIVE_EDIT_SPACING
+from src.vestige.rate_limiter import Priority, set_priority
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """One live /info message"""
+    __slots__ = ("interaction", "channel_id", "asset_id", "currency", "view", "signature", "graph", "expires_at")
+
+    def __init__(self, interaction, asset_id, currency):
+        self.interaction = interaction
+        self.channel_id = interaction.channel_id
+        self.asset_id = asset_id
+        self.currency = currency
+        self.view = None
+        # What the message shows right now, a refresh that renders the same is skipped
+        self.signature = None
+        self.graph = None
+        self.expires_at = None
+
+class EditScheduler:
+    """Message edits queued per channel and sent at most one per `spacing` seconds.
+
+    A newer edit for a message that's still queued replaces the old one in
+    place, so a slow channel only ever sends the latest state.
+    """
+    def __init__(self, spacing):
+        self.spacing = spacing
+        # channel_id -> key -> edit coroutine function
+        self.queues = {}
+        self.tasks = {}
+
+        self.sent = 0
+        self.coalesced = 0
+
+    def submit(self, channel_id, key, edit):
+        queue = self.queues.setdefault(channel_id, OrderedDict())
+        if key in queue:
+            self.coalesced += 1
+        queue[key] = edit
+        if channel_id not in self.tasks:
+            self.tasks[channel_id] = asyncio.create_task(self.drain(channel_id))
+
+    def discard(self, channel_id, key):
+        queue = self.queues.get(channel_id)
+        if queue:
+            queue.pop(key, None)
+
+    async def drain(self, channel_id):
+        queue = self.queues[channel_id]
+        try:
+            while queue:
+                _, edit = queue.popitem(last=False)
+                try:
+                    await edit()
+                    self.sent += 1
+                except Exception as e:
+                    logger.warning(f"live edit failed :: {e}", extra={"user": "live", "id": channel_id})
+                await asyncio.sleep(self.spacing)
+        finally:
+            del self.queues[channel_id]
+            del self.tasks[channel_id]
+
+    def queue_depth(self):
+        return sum(len(queue) for queue in self.queues.values())
+
+    def stop(self):
+        for task in list(self.tasks.values()):
+            task.cancel()
+
+class LiveTicker:
+    """Live /info messages refreshed on one shared loop.
+
+    Every tick each asset with live messages is refreshed once through
+    `refresher(asset_id, subscriptions)`, however many messages show it. The
+    refresher hands the edits that change something to `scheduler`.
+    """
+    def __init__(self, interval=LIVE_INTERVAL, max_duration=LIVE_MAX_DURATION,
+                 max_messages=LIVE_MAX_MESSAGES, edit_spacing=LIVE_EDIT_SPACING):
+        self.interval = interval
+        self.max_duration = max_duration
+        self.max_messages = max_messages
+        self.scheduler = EditScheduler(edit_spacing)
+
+        # asset_id -> [Subscription]
+        self.subscriptions = {}
+        self.refresher = None
+        self.task = None
+
+        self.ticks = 0
+        self.skipped = 0
+
+    def __len__(self):
+        return sum(len(subscriptions) for subscriptions in self.subscriptions.values())
+
+    def stats(self):
+        return {
+            "messages": len(self),
+            "assets": len(self.subscriptions),
+            "ticks": self.ticks,
+            "edits": self.scheduler.sent,
+            "skipped": self.skipped,
+            "coalesced": self.scheduler.coalesced,
+            "queue_depth": self.scheduler.queue_depth()
+        }
+
+    def start(self, refresher):
+        """Start the refresh loop, safe to call on every on_ready"""
+        self.refresher = refresher
+        if self.task and not self.task.done():
+            return
+        self.task = asyncio.create_task(self.refresh_forever())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        self.scheduler.stop()
+
+    def subscribe(self, interaction, asset_id, currency):
+        """New live message, None when we're at capacity"""
+        if len(self) >= self.max_messages:
+            return None
+        subscription = Subscription(interaction, asset_id, currency)
+        self.subscriptions.setdefault(asset_id, []).append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        subscriptions = self.subscriptions.get(subscription.asset_id)
+        if subscriptions and subscription in subscriptions:
+            subscriptions.remove(subscription)
+            if not subscriptions:
+                del self.subscriptions[subscription.asset_id]
+        self.scheduler.discard(subscription.channel_id, subscription)
+
+    def touch(self, subscription, interaction, currency, view, signature, graph):
+        """The message was just edited through `interaction`, which also restarts its clock"""
+        subscription.interaction = interaction
+        subscription.currency = currency
+        subscription.view = view
+        subscription.signature = signature
+        subscription.graph = graph
+        subscription.expires_at = time.monotonic() + self.max_duration
+
+    def schedule(self, subscription, edit):
+        self.scheduler.submit(subscription.channel_id, subscription, edit)
+
+    async def refresh_forever(self):
+        set_priority(Priority.BACKGROUND)
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.warning(f"live tick failed :: {e}", extra={"user": "live", "id": "-"})
+
+    async def tick(self):
+        now = time.monotonic()
+        for subscriptions in list(self.subscriptions.values()):
+            for subscription in list(subscriptions):
+                if subscription.expires_at is not None and now >= subscription.expires_at:
+                    self.unsubscribe(subscription)
+
+        self.ticks += 1
+        if self.refresher is None:
+            return
+        await asyncio.gather(*(
+            self.refresh(asset_id, list(subscriptions))
+            for asset_id, subscriptions in list(self.subscriptions.items())
+        ))
+
+    async def refresh(self, asset_id, subscriptions):
+        try:
+            await self.refresher(asset_id, subscriptions)
+        except Exception as e:
+            logger.warning(f"live refresh of {asset_id} failed :: {e}", extra={"user": "live", "id": "-"})
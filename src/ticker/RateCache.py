@@ -0,0 +1,82 @@
+import asyncio, logging, time
+
+from consts import NETWORK_ID, CURRENCY_ASSETS, RATE_REFRESH_INTERVAL, RATE_MAX_AGE
+from src.vestige.rate_limiter import Priority, set_priority
+
+logger = logging.getLogger(__name__)
+
+class RateCache:
+    """Process-wide ALGO -> fiat rates, refreshed in the background.
+
+    Readers get the last known rates straight from memory and never wait on a
+    refresh. A failed refresh keeps the old values and marks them stale.
+    """
+    def __init__(self, vestige, interval=RATE_REFRESH_INTERVAL, max_age=RATE_MAX_AGE):
+        self.vestige = vestige
+        self.interval = interval
+        self.max_age = max_age
+
+        self.rates = {}
+        self.updated_at = None
+        self.failed = False
+        self.task = None
+
+    async def start(self):
+        """Load the rates once and keep them fresh, safe to call on every on_ready"""
+        if self.task and not self.task.done():
+            return
+        await self.refresh()
+        self.task = asyncio.create_task(self.refresh_forever())
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def refresh_forever(self):
+        set_priority(Priority.BACKGROUND)
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.refresh()
+
+    async def refresh(self):
+        try:
+            rates = await asyncio.gather(*(self.fetch_rate(asset_id) for asset_id in CURRENCY_ASSETS.values()))
+        except Exception as e:
+            logger.warning(f"rate refresh failed :: {e}", extra={"user": "rates", "id": "-"})
+            self.failed = True
+            return False
+
+        if None in rates:
+            self.failed = True
+            return False
+
+        # Swap the whole dict in one go, readers never see a half update
+        self.rates = dict(zip(CURRENCY_ASSETS, rates))
+        self.updated_at = time.time()
+        self.failed = False
+        return True
+
+    async def fetch_rate(self, asset_id):
+        status, data = await self.vestige.get(
+            "/assets/search", params={"network_id": NETWORK_ID, "query": asset_id, "limit": 1})
+        if status != 200:
+            return None
+        results = data.get("results", [])
+        if not results:
+            return None
+        # Price is ALGOs per unit of currency (e.g. 3.3 Algos per USDC)
+        price_in_algo = results[0]["price"]
+        return 1.0 / price_in_algo if price_in_algo > 0 else 0
+
+    @property
+    def stale(self):
+        if self.updated_at is None:
+            return True
+        return self.failed or time.time() - self.updated_at > self.max_age
+
+    def snapshot(self):
+        """Copy of the current rates (ALGO included) and whether they're stale"""
+        currencies = dict(self.rates)
+        currencies["ALGO"] = 1
+        return currencies, self.stale
@@ -0,0 +1,94 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from src.ticker.graph import draw_sparkline, draw_comparison, normalize, warm_up
+from src.ticker.ChartCache import ChartCache
+from consts import RENDER_WORKERS, RENDER_QUEUE_LIMIT, RENDER_TIMEOUT, CHART_CACHE_BYTES, CHART_BACKEND, CHART_FORMAT
+
+CHART_STYLE = f"sparkline-{CHART_BACKEND}-{CHART_FORMAT}"
+
+class RenderBusy(Exception):
+    """The render backlog is full, the caller should go on without a chart"""
+
+class RenderService:
+    """Chart rendering in a bounded worker pool, off the event loop.
+
+    At most `queue_limit` renders are running or waiting at any time, beyond
+    that `render` fails fast with RenderBusy instead of piling up work behind
+    a burst of /info calls.
+    """
+    def __init__(self, workers=RENDER_WORKERS, queue_limit=RENDER_QUEUE_LIMIT, timeout=RENDER_TIMEOUT, cache_bytes=CHART_CACHE_BYTES):
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="render")
+        self.cache = ChartCache(cache_bytes)
+        self.queue_limit = queue_limit
+        self.timeout = timeout
+        self.pending = 0
+
+    @property
+    def queue_depth(self):
+        return self.pending
+
+    async def run(self, func, *args):
+        """Run a render function on the pool, returns whatever it returns"""
+        if self.pending >= self.queue_limit:
+            raise RenderBusy(f"{self.pending} renders pending")
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await asyncio.wait_for(loop.run_in_executor(self.executor, func, *args), self.timeout)
+        finally:
+            self.pending -= 1
+
+    async def warm(self):
+        """Load the chart backend on a worker, chart modules are only imported on first use otherwise"""
+        await self.run(warm_up)
+
+    async def render(self, series, seconds=None, asset_id=None):
+        """Encoded bytes of the series chart, served from the cache when the asset is given.
+
+        None when the series has no candles inside the window. The columns are
+        copied here so workers never share them with the loop.
+        """
+        key = None
+        if asset_id is not None:
+            key = (asset_id, seconds, series.interval, series.last_timestamp, CHART_STYLE)
+            png = self.cache.get(key)
+            if png is not None:
+                return png
+
+        timestamps, closes = series.points(seconds)
+        if not len(timestamps):
+            return None
+        png = await self.run(draw_sparkline, timestamps, closes)
+        if key is not None:
+            self.cache.put(key, png)
+        return png
+
+    async def render_comparison(self, series_by_asset, seconds=None):
+        """Encoded bytes of one normalized chart for several (asset_id, series), in COMPARE_COLORS order.
+
+        Assets without candles in the window are left off the chart but keep
+        their colour, None when that's every asset.
+        """
+        key = tuple(
+            (asset_id, series.interval, series.last_timestamp) if series else (asset_id,)
+            for asset_id, series in series_by_asset
+        ) + (seconds, f"compare-{CHART_BACKEND}-{CHART_FORMAT}")
+        png = self.cache.get(key)
+        if png is not None:
+            return png
+
+        lines = []
+        for _, series in series_by_asset:
+            timestamps, closes = series.points(seconds) if series else ((), ())
+            lines.append((timestamps, normalize(closes)) if len(timestamps) else None)
+        if not any(lines):
+            return None
+        # One render pass for all the lines
+        png = await self.run(draw_comparison, lines)
+        self.cache.put(key, png)
+        return png
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,181 @@
+import asyncio, heapq, logging, math, time
+from bisect import insort
+
+from src.ticker.TokenInfo import TokenInfo, normalize_ticker, rank_key
+from consts import NETWORK_ID, LIST_URL, INDEX_PAGE_SIZE, INDEX_MAX_ASSETS, INDEX_REFRESH_INTERVAL
+from src.vestige.rate_limiter import Priority, set_priority
+
+logger = logging.getLogger(__name__)
+
+class TickerIndex:
+    """In-memory ticker -> asset index over the ranked asset universe.
+
+    Bulk loaded at startup, then one page is re-fetched per refresh tick so the
+    whole universe is kept current without re-downloading it in one go.
+    Lookups are a dict hit, the remote search is only needed on a miss.
+    """
+    def __init__(self, vestige, disk=None, page_size=INDEX_PAGE_SIZE, max_assets=INDEX_MAX_ASSETS, interval=INDEX_REFRESH_INTERVAL):
+        self.vestige = vestige
+        self.disk = disk
+        self.page_size = page_size
+        self.max_assets = max_assets
+        self.interval = interval
+
+        # normalized ticker -> [(rank, asset_id)] kept sorted, best rank first
+        self.tickers = {}
+        # asset_id -> compact TokenInfo, lookups hand out copies
+        self.assets = {}
+        # asset_id -> when its price was fetched, assets restored from disk have none
+        self.updated_at = {}
+
+        self.next_offset = 0
+        self.task = None
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.assets)
+
+    def add(self, token: TokenInfo):
+        """Insert or update one asset"""
+        if self.disk:
+            self.disk.save_tokens([token.to_json()])
+        self.insert(token, time.time())
+
+    def insert(self, token: TokenInfo, fetched_at=None):
+        token.compact()
+        previous = self.assets.get(token.asset_id)
+        if previous is not None:
+            self.discard(previous)
+
+        self.assets[token.asset_id] = token
+        if fetched_at is not None:
+            self.updated_at[token.asset_id] = fetched_at
+        ranked = self.tickers.setdefault(normalize_ticker(token.ticker), [])
+        insort(ranked, (rank_key(token.rank), token.asset_id))
+
+    def add_many(self, tokens, persist=True):
+        """Insert or update a batch, `persist=False` is for assets restored from disk"""
+        tokens = list(tokens)
+        # One write-through batch instead of one per asset
+        if persist and self.disk:
+            self.disk.save_tokens([token.to_json() for token in tokens])
+        fetched_at = time.time() if persist else None
+        for token in tokens:
+            self.insert(token, fetched_at)
+
+    def discard(self, token: TokenInfo):
+        ticker = normalize_ticker(token.ticker)
+        ranked = self.tickers.get(ticker)
+        if not ranked:
+            return
+        ranked[:] = [entry for entry in ranked if entry[1] != token.asset_id]
+        if not ranked:
+            del self.tickers[ticker]
+
+    def lookup(self, ticker):
+        """Highest ranked asset for the ticker as a new TokenInfo, None on a miss"""
+        ranked = self.tickers.get(normalize_ticker(ticker))
+        if not ranked:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self.assets[ranked[0][1]].copy()
+
+    def age(self, asset_id):
+        """Seconds since the asset's price was fetched, inf if we don't know"""
+        fetched_at = self.updated_at.get(asset_id)
+        return math.inf if fetched_at is None else time.time() - fetched_at
+
+    async def refresh_asset(self, asset_id):
+        """Re-fetch one asset into the index, returns a fresh copy or None"""
+        status, data = await self.vestige.get_shared(
+            "/assets/search", params={"network_id": NETWORK_ID, "query": asset_id, "limit": 1})
+        if status != 200:
+            return None
+        for row in data.get("results", []):
+            if row.get("id") == asset_id:
+                token = TokenInfo(row)
+                self.add(token)
+                return token.copy()
+        return None
+
+    def stats(self):
+        return {
+            "assets": len(self.assets),
+            "tickers": len(self.tickers),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+    async def start(self):
+        """Restore the index from disk, or load the top ranked page when there's nothing there.
+
+        The rest of the universe loads (or refreshes) in the background. Safe to
+        call on every on_ready.
+        """
+        if self.task and not self.task.done():
+            return
+        if self.disk and not self.assets:
+            self.add_many((TokenInfo(row) for row in await self.disk.load_tokens()), persist=False)
+
+        if self.assets:
+            logger.info(f"ticker index restored {len(self)} assets from disk", extra={"user": "index", "id": "-"})
+            self.task = asyncio.create_task(self.load_rest(0, self.page_size))
+        else:
+            loaded = await self.load_page(0)
+            self.task = asyncio.create_task(self.load_rest(self.page_size, loaded))
+
+    async def load_rest(self, offset, loaded):
+        set_priority(Priority.BACKGROUND)
+        while loaded == self.page_size and offset < self.max_assets:
+            loaded = await self.load_page(offset)
+            offset += self.page_size
+        logger.info(f"ticker index loaded {len(self)} assets", extra={"user": "index", "id": "-"})
+        await self.refresh_forever()
+
+    def top(self, n):
+        """The n best ranked assets we know of"""
+        return heapq.nsmallest(n, self.assets.values(), key=lambda token: rank_key(token.rank))
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def refresh_forever(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            loaded = await self.load_page(self.next_offset)
+            # Walk the ranked pages, wrap around at the end of the universe
+            self.next_offset += self.page_size
+            if loaded < self.page_size or self.next_offset >= self.max_assets:
+                self.next_offset = 0
+
+    async def load_page(self, offset):
+        """Fetch one ranked page into the index, returns how many assets came back"""
+        params = {
+            "network_id": NETWORK_ID,
+            "limit": self.page_size,
+            "offset": offset,
+            "order_by": "rank",
+            "order_dir": "asc"
+        }
+        try:
+            status, data = await self.vestige.get(LIST_URL, params=params)
+        except Exception as e:
+            logger.warning(f"ticker index page {offset} failed :: {e}", extra={"user": "index", "id": "-"})
+            return 0
+        if status != 200:
+            logger.warning(f"ticker index page {offset} failed :: {status}", extra={"user": "index", "id": "-"})
+            return 0
+
+        results = data.get("results", []) if isinstance(data, dict) else data
+        try:
+            self.add_many(TokenInfo(row) for row in results)
+        except Exception as e:
+            # A malformed row must not take the refresh loop (or startup) down with it
+            logger.warning(f"ticker index page {offset} unreadable :: {e!r}", extra={"user": "index", "id": "-"})
+            return 0
+        return len(results)
@@ -1,39 +1,117 @@
+import math
+
+# Attribute -> key in the Vestige asset json
+FIELDS = {
+    "image": "image",
+    "asset_id": "id",
+    "asset_name": "name",
+    "ticker": "ticker",
+
+    "creation_timestamp": "created_at",
+    "decimals": "decimals",
+
+    "total_lockup": "total_lockup",
+    "rank": "rank",
+    "tvl": "tvl",
+    "market_cap": "market_cap",
+
+    "price": "price",
+    "price1h": "price1h",
+    "price1d": "price1d",
+    "price7d": "price7d",
+
+    "volume1h": "volume1h",
+    "volume1d": "volume1d",
+    "volume7d": "volume7d",
+
+    "swaps1h": "swaps1h",
+    "swaps1d": "swaps1d",
+    "swaps7d": "swaps7d",
+}
+
+# Calculated items, filled in by the workflow
+CALCULATED = (
+    "graph",
+    "highest_24h", "lowest_24h",
+    "highest_7d", "lowest_7d",
+    "change_24_hrs", "change_7_days",
+)
+
+def normalize_ticker(ticker):
+    """Tickers match case-insensitively, with or without people's leading $"""
+    return (ticker or "").lower().strip().lstrip("$")
+
+def rank_key(rank):
+    # Unranked assets lose to every ranked one
+    return math.inf if rank is None else rank
+
 class TokenInfo:
+    """Slotted asset record, fields are parsed from the raw json on first access.
+
+    `compact()` parses everything and drops the json, which is what long-lived
+    copies (the ticker index) keep.
+    """
+    __slots__ = ("_raw",) + tuple(FIELDS) + CALCULATED
+
     def __init__(self, json_object):
-            self.image = json_object["image"]
-            self.asset_id = json_object["id"]
-            self.asset_name = json_object["name"]
-            self.ticker = json_object["ticker"]
-
-            self.creation_timestamp = json_object["created_at"]
-            self.decimals = json_object["decimals"]
-            
-            self.total_lockup = json_object["total_lockup"]
-            self.rank = json_object["rank"]
-            self.tvl = json_object["tvl"]
-            self.market_cap = json_object["market_cap"]
-
-            self.price = json_object["price"]
-            self.price1h = json_object["price1h"]
-            self.price1d = json_object["price1d"]
-            self.price7d = json_object["price7d"]
-
-            self.volume1h = json_object["volume1h"]
-            self.volume1d = json_object["volume1d"]
-            self.volume7d = json_object["volume7d"]
-
-            self.swaps1h = json_object["swaps1h"]
-            self.swaps1d = json_object["swaps1d"]
-            self.swaps7d = json_object["swaps7d"]
-
-            # Calculated items
-            self.graph = None
-            
-            self.highest_24h = None
-            self.lowest_24h = None
-            
-            self.highest_7d = None
-            self.lowest_7d = None
-
-            self.change_24_hrs = None
-            self.change_7_days = None
\ No newline at end of file
+        self._raw = json_object
+
+    def __getattr__(self, name):
+        # Only called for slots that haven't been set yet
+        if name in FIELDS:
+            value = self._raw[FIELDS[name]]
+        elif name in CALCULATED:
+            value = None
+        else:
+            raise AttributeError(name)
+        setattr(self, name, value)
+        return value
+
+    def compact(self):
+        for name in FIELDS:
+            getattr(self, name)
+        self._raw = None
+        return self
+
+    def to_json(self):
+        """The asset back in Vestige's json shape"""
+        if self._raw is not None:
+            return self._raw
+        return {key: getattr(self, name) for name, key in FIELDS.items()}
+
+    def copy(self):
+        """Fresh record with the same asset fields and no calculated items"""
+        token = TokenInfo.__new__(TokenInfo)
+        token._raw = self._raw
+        for name in FIELDS:
+            try:
+                setattr(token, name, object.__getattribute__(self, name))
+            except AttributeError:
+                pass
+        return token
+
+class TokenBatch:
+    """Column-oriented search results.
+
+    Only the ticker and rank columns are pulled out of the rows, a TokenInfo
+    is built just for the winning row.
+    """
+    def __init__(self, rows):
+        self.rows = rows
+        self.tickers = [normalize_ticker(row["ticker"]) for row in rows]
+        self.ranks = [rank_key(row["rank"]) for row in rows]
+
+    def __len__(self):
+        return len(self.rows)
+
+    def best_match(self, ticker):
+        """Highest ranked row for the ticker as a TokenInfo, None when nothing matches.
+
+        Ties go to the lower asset id, the same order TickerIndex.lookup uses.
+        """
+        ticker = normalize_ticker(ticker)
+        best = None
+        for i, candidate in enumerate(self.tickers):
+            if candidate == ticker and (best is None or (self.ranks[i], self.rows[i]["id"]) < (self.ranks[best], self.rows[best]["id"])):
+                best = i
+        return None if best is None else TokenInfo(self.rows[best])
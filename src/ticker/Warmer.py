@@ -0,0 +1,99 @@
+import asyncio, logging, time
+from collections import Counter
+
+from src.ticker.CandleSeries import WEEK
+from src.ticker.CandleStore import candle_interval, window_start
+from src.ticker.RenderService import RenderBusy
+from consts import WARM_TOP_N, WARM_RECENT_N, WARM_INTERVAL, WARM_CONCURRENCY
+from src.vestige.rate_limiter import Priority, set_priority
+
+logger = logging.getLogger(__name__)
+
+class Warmer:
+    """Keeps candles and charts warm for the assets people are likely to ask for.
+
+    Every cycle takes the top ranked assets from the ticker index plus the most
+    queried ones since the last cycles, and preloads their 7d candles and chart.
+    Work runs a few assets at a time and skips rendering while live commands
+    are waiting on the render pool.
+    """
+    def __init__(self, top_n=WARM_TOP_N, recent_n=WARM_RECENT_N, interval=WARM_INTERVAL, concurrency=WARM_CONCURRENCY):
+        self.top_n = top_n
+        self.recent_n = recent_n
+        self.interval = interval
+        self.semaphore = asyncio.Semaphore(concurrency)
+
+        # asset_id -> recent query count, halved every cycle so it follows what's hot now
+        self.queries = Counter()
+        self.task = None
+
+        self.cycles = 0
+        self.warmed = 0
+
+    def stats(self):
+        return {
+            "cycles": self.cycles,
+            "warmed": self.warmed,
+            "tracked_assets": len(self.queries)
+        }
+
+    def record(self, asset_id):
+        self.queries[asset_id] += 1
+
+    def start(self, bot):
+        """Start warming in the background, safe to call on every on_ready"""
+        if self.task and not self.task.done():
+            return
+        self.task = asyncio.create_task(self.warm_forever(bot))
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def warm_forever(self, bot):
+        set_priority(Priority.BACKGROUND)
+        while True:
+            try:
+                await self.warm(bot)
+            except Exception as e:
+                logger.warning(f"warm cycle failed :: {e}", extra={"user": "warmer", "id": "-"})
+            await asyncio.sleep(self.interval)
+
+    def targets(self, bot):
+        asset_ids = [token.asset_id for token in bot.ticker_data.top(self.top_n)]
+        for asset_id, _ in self.queries.most_common(self.recent_n):
+            if asset_id not in asset_ids:
+                asset_ids.append(asset_id)
+        return [bot.ticker_data.assets[asset_id] for asset_id in asset_ids if asset_id in bot.ticker_data.assets]
+
+    async def warm(self, bot):
+        started = time.monotonic()
+        tokens = self.targets(bot)
+        await asyncio.gather(*(self.warm_token(bot, token) for token in tokens))
+
+        for asset_id in list(self.queries):
+            self.queries[asset_id] //= 2
+            if not self.queries[asset_id]:
+                del self.queries[asset_id]
+        self.cycles += 1
+        logger.info(f"warmed {len(tokens)} assets in {time.monotonic() - started:.1f}s", extra={"user": "warmer", "id": "-"})
+
+    async def warm_token(self, bot, token):
+        async with self.semaphore:
+            interval = candle_interval(token)
+            try:
+                _, series = await bot.candles.get(token.asset_id, interval, window_start(interval, WEEK))
+            except Exception as e:
+                logger.debug(f"warm candles {token.asset_id} failed :: {e}", extra={"user": "warmer", "id": "-"})
+                return
+            if not series:
+                return
+
+            # Live commands go first, only render into an idle pool
+            if bot.renderer.queue_depth == 0:
+                try:
+                    await bot.renderer.render(series, WEEK, asset_id=token.asset_id)
+                except (RenderBusy, asyncio.TimeoutError):
+                    pass
+            self.warmed += 1
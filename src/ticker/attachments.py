@@ -0,0 +1,33 @@
+import discord, io
+from functools import cache
+
+from consts import CHART_FORMAT
+
+LOGO_PATH = "./images/logo.png"
+LOGO_NAME = "vestige.png"
+# The logo only ever shows as a footer icon, a few times that is plenty
+LOGO_SIZE = 64
+CHART_EXTENSION = "webp" if CHART_FORMAT == "webp" else "png"
+
+@cache
+def logo_bytes():
+    """The footer logo, read and shrunk once then kept in memory"""
+    from PIL import Image
+
+    with Image.open(LOGO_PATH) as logo:
+        logo = logo.convert("RGBA")
+        logo.thumbnail((LOGO_SIZE, LOGO_SIZE), Image.LANCZOS)
+        img_io = io.BytesIO()
+        logo.save(img_io, format="PNG", optimize=True)
+    return img_io.getvalue()
+
+def logo_file():
+    # discord.File consumes its buffer, every message needs a fresh one over the same bytes
+    return discord.File(io.BytesIO(logo_bytes()), LOGO_NAME)
+
+def chart_name(stem):
+    """Attachment filename for a chart, the extension has to match CHART_FORMAT"""
+    return f"{stem}.{CHART_EXTENSION}"
+
+def chart_file(data, stem):
+    return discord.File(io.BytesIO(data), chart_name(stem))
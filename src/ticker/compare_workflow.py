@@ -0,0 +1,119 @@
+import asyncio
+import discord
+
+from src.Bot import Bot
+from src.ticker.TokenInfo import normalize_ticker
+from src.ticker.CandleSeries import WEEK
+from src.ticker.RenderService import RenderBusy
+from src.ticker.graph import COMPARE_COLORS
+from src.ticker.utils import get_ticker_infos, get_fresh_token, get_ticker_candles, get_currencies, build_currency_views
+from src.ticker.ui_compare_workflow import compare_ui
+from consts import COMPARE_MAX_TICKERS, COMPARE_CONCURRENCY, COMPARE_CANDLE_BUDGET
+
+from src.logger import notify_bot, notify_admin
+from src.metrics import STAGE_SECONDS
+
+# One colour per line on the chart
+MAX_TICKERS = min(COMPARE_MAX_TICKERS, len(COMPARE_COLORS))
+
+def parse_tickers(text):
+    """Comma or space separated tickers in the order given, repeats dropped"""
+    tickers, seen = [], set()
+    for ticker in text.replace(",", " ").split():
+        if normalize_ticker(ticker) and normalize_ticker(ticker) not in seen:
+            seen.add(normalize_ticker(ticker))
+            tickers.append(ticker.lower())
+    return tickers
+
+async def get_all_candles(interaction, bot, tokens):
+    """7d candles for every token, None where they failed or missed the budget.
+
+    At most COMPARE_CONCURRENCY fetches run at once and the whole lot gets
+    COMPARE_CANDLE_BUDGET seconds, a slow asset is left off the chart rather
+    than holding up the rest.
+    """
+    semaphore = asyncio.Semaphore(COMPARE_CONCURRENCY)
+
+    async def fetch(token):
+        async with semaphore:
+            return await get_ticker_candles(interaction, bot, token, 7)
+
+    tasks = [asyncio.create_task(fetch(token)) for token in tokens]
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=COMPARE_CANDLE_BUDGET)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    if pending:
+        notify_bot(interaction, f"compare candles over budget for {len(pending)} assets")
+
+    candles = []
+    for token, task in zip(tokens, tasks):
+        if task not in done:
+            candles.append(None)
+        elif task.exception() is not None:
+            notify_bot(interaction, f"candles for {token.ticker} failed :: {task.exception()}")
+            candles.append(None)
+        else:
+            candles.append(task.result())
+    return candles
+
+async def compare_workflow(interaction: discord.Interaction, bot: Bot, tickers_text: str):
+    tickers = parse_tickers(tickers_text)
+    if len(tickers) < 2:
+        await interaction.edit_original_response(content="Give me at least two tickers, e.g. `/compare algo,gold,usdc`")
+        return None
+    if len(tickers) > MAX_TICKERS:
+        await interaction.edit_original_response(content=f"I can compare up to {MAX_TICKERS} tickers at once")
+        return None
+
+    # Currencies (cached) don't depend on the tokens, start them right away
+    currencies_task = asyncio.create_task(get_currencies(interaction, bot))
+    try:
+        # One index pass, only the misses go to the search
+        with STAGE_SECONDS.time(command="compare", stage="token"):
+            tokens = await get_ticker_infos(interaction, bot, tickers)
+        missing = [ticker for ticker, token in zip(tickers, tokens) if token is None]
+        if missing:
+            await interaction.edit_original_response(content=f"Ticker not found: {', '.join(missing)}")
+            return None
+
+        for token in tokens:
+            bot.warmer.record(token.asset_id)
+
+        # Index prices past INFO_PRICE_STALE are re-fetched like /info does, alongside the candles
+        with STAGE_SECONDS.time(command="compare", stage="candles"):
+            tokens, candles = await asyncio.gather(
+                asyncio.gather(*(get_fresh_token(interaction, bot, token) for token in tokens)),
+                get_all_candles(interaction, bot, tokens)
+            )
+        # A series can hold candles and still have none in the last week, it stays off the chart
+        candles = [series if series and len(series.points(WEEK)[0]) else None for series in candles]
+
+        with STAGE_SECONDS.time(command="compare", stage="currencies"):
+            currencies, stale_rates = await currencies_task
+        if currencies == None:
+            await interaction.edit_original_response(content="Problem pulling algos current price.")
+            return None
+
+        graph = None
+        if any(candles):
+            try:
+                # Every line in one render pass
+                with STAGE_SECONDS.time(command="compare", stage="render"):
+                    graph = await bot.renderer.render_comparison(
+                        [(token.asset_id, series) for token, series in zip(tokens, candles)], WEEK)
+            except (RenderBusy, asyncio.TimeoutError) as e:
+                notify_bot(interaction, f"chart skipped :: {e!r}")
+
+        views = [build_currency_views(currencies, token)["USD"] for token in tokens]
+        await compare_ui(interaction, tokens, views, [bool(series) for series in candles], graph, stale_rates)
+
+    except Exception as e:
+        await interaction.edit_original_response(content="Something bad happened, and I need an adult...")
+        await notify_admin(interaction, bot, f"Compare: {tickers_text} :: Reason: {e}")
+
+    finally:
+        if not currencies_task.done():
+            currencies_task.cancel()
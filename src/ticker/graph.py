@@ -1,27 +1,247 @@
-import matplotlib.pyplot as plt
 import datetime
 import io
 
-def get_graph(candles):     
-    sorted_candles = sorted(candles, key=lambda x: x["timestamp"])
-    times = [datetime.datetime.fromtimestamp(candle["timestamp"]) for candle in sorted_candles]
-    prices = [float(candle["close"]) for candle in sorted_candles]  # Ensure float conversion
+from consts import CHART_BACKEND, CHART_FORMAT, CHART_COLORS
+
+# Both backends draw the same 10x5in @ 100dpi canvas with matplotlib's default subplot margins
+WIDTH, HEIGHT = 1000, 500
+PLOT_BOX = (125, 60, 900, 445) # left, top, right, bottom
+LINE_WIDTH = 8 * 100 / 72 # 8pt in pixels
+GREEN = (0, 128, 0)
+FILL_ALPHA = 0.2
+SUPERSAMPLE = 2
+
+# /compare line colours, matched by the embed's emoji squares
+COMPARE_COLORS = (
+    ("🟩", (0, 128, 0)),
+    ("🟦", (30, 110, 230)),
+    ("🟧", (240, 140, 0)),
+    ("🟥", (220, 40, 40)),
+    ("🟪", (150, 60, 200)),
+)
+AXIS_GREY = (128, 128, 128)
+
+def encode(image, fmt=CHART_FORMAT):
+    """Upload bytes of an RGBA Pillow image in the configured CHART_FORMAT"""
+    from PIL import Image
+
+    img_io = io.BytesIO()
+    if fmt == "webp":
+        image.save(img_io, format="WEBP", quality=80, method=4)
+    elif fmt == "png8":
+        # A few flat colours plus their anti-aliased edges, a small palette keeps them all
+        image = image.quantize(colors=CHART_COLORS, method=Image.Quantize.FASTOCTREE)
+        image.save(img_io, format="PNG", optimize=True)
+    else:
+        image.save(img_io, format="PNG")
+    return img_io.getvalue()
+
+def encode_figure(fig, fmt=CHART_FORMAT):
+    """Upload bytes of a matplotlib Figure, raw pixels go through encode unless plain PNG is wanted"""
+    img_io = io.BytesIO()
+    if fmt == "png":
+        fig.savefig(img_io, format="png", transparent=True)
+        return img_io.getvalue()
+
+    from PIL import Image
+
+    fig.savefig(img_io, format="rgba", transparent=True)
+    size = fig.canvas.get_width_height()
+    return encode(Image.frombuffer("RGBA", size, img_io.getbuffer(), "raw", "RGBA", 0, 1), fmt)
+
+def warm_up(backend=CHART_BACKEND):
+    """Draw a throwaway chart so the backend's imports, fonts and encoder are loaded before the first /info"""
+    draw_sparkline([0, 1], [1.0, 2.0], backend)
+    if backend != "pillow":
+        draw_comparison([([0, 1], [0.0, 1.0])], backend)
+
+def draw_sparkline(timestamps, closes, backend=CHART_BACKEND):
+    """Render the close price sparkline as transparent CHART_FORMAT bytes with the configured backend"""
+    if backend == "pillow":
+        return draw_pillow(timestamps, closes)
+    return draw_matplotlib(timestamps, closes)
+
+def draw_matplotlib(timestamps, closes):
+    """Uses its own Figure instead of the pyplot state machine so renders can
+    run side by side in the RenderService worker threads.
+    """
+    from matplotlib.figure import Figure
+
+    times = [datetime.datetime.fromtimestamp(timestamp) for timestamp in timestamps]
+    prices = list(closes)
 
     # Plot the data
-    plt.figure(figsize=(10, 5), facecolor="none")
-    plt.plot(times, prices, linestyle="-", color="green", linewidth=8)
-    
+    fig = Figure(figsize=(10, 5), facecolor="none")
+    ax = fig.add_subplot()
+    ax.plot(times, prices, linestyle="-", color="green", linewidth=8)
+
     # Add fill below the line
-    plt.fill_between(times, prices, min(prices), alpha=0.2, color="green")
-    
+    ax.fill_between(times, prices, min(prices), alpha=0.2, color="green")
+
     # Set the limits to zoom in on the data
-    plt.xlim(times[0], times[-1])
-    plt.ylim(min(prices), max(prices))
-    plt.axis('off')
-    
-    img_io = io.BytesIO()
-    plt.savefig(img_io, format="png", transparent=True)
-    img_io.seek(0)
-    plt.close()
+    ax.set_xlim(times[0], times[-1])
+    ax.set_ylim(min(prices), max(prices))
+    ax.axis('off')
+
+    return encode_figure(fig)
+
+def downsample(timestamps, closes, buckets):
+    """Keep the min and max close of every pixel column, in time order.
+
+    Extremes survive so the shape and the y range match the full series.
+    """
+    if len(timestamps) <= 2 * buckets:
+        return list(timestamps), list(closes)
+
+    start, span = timestamps[0], (timestamps[-1] - timestamps[0]) or 1
+    out_times, out_prices = [], []
+    bucket, lo, hi = None, None, None
+
+    def flush():
+        for i in sorted({lo, hi}):
+            out_times.append(timestamps[i])
+            out_prices.append(closes[i])
+
+    for i, timestamp in enumerate(timestamps):
+        current = min(buckets - 1, int((timestamp - start) * buckets / span))
+        if current != bucket:
+            if bucket is not None:
+                flush()
+            bucket, lo, hi = current, i, i
+        else:
+            if closes[i] < closes[lo]: lo = i
+            if closes[i] > closes[hi]: hi = i
+    flush()
+
+    return out_times, out_prices
+
+def draw_pillow(timestamps, closes):
+    """Same sparkline as draw_matplotlib drawn straight with Pillow, no matplotlib import.
+
+    Drawn at SUPERSAMPLE x and scaled down for anti-aliased edges.
+    """
+    from PIL import Image, ImageDraw
+
+    left, top, right, bottom = (edge * SUPERSAMPLE for edge in PLOT_BOX)
+    plot_width, plot_height = right - left, bottom - top
+
+    times, prices = downsample(timestamps, closes, PLOT_BOX[2] - PLOT_BOX[0])
+    t_min, t_span = times[0], (times[-1] - times[0]) or 1
+    p_min, p_max = min(prices), max(prices)
+    p_span = p_max - p_min
+
+    def to_xy(timestamp, price):
+        x = (timestamp - t_min) / t_span * plot_width
+        # Flat series sit in the middle like matplotlib's expanded limits
+        y = plot_height / 2 if p_span == 0 else (p_max - price) / p_span * plot_height
+        return x, y
+
+    points = [to_xy(timestamp, price) for timestamp, price in zip(times, prices)]
+    if len(points) == 1:
+        points.append((plot_width, points[0][1]))
+
+    # Everything is drawn on the plot box alone, which clips it the way the axes do
+    plot = Image.new("RGBA", (plot_width, plot_height), (0, 0, 0, 0))
+    fill = Image.new("RGBA", (plot_width, plot_height), (0, 0, 0, 0))
+    fill_bottom = to_xy(t_min, p_min)[1]
+    ImageDraw.Draw(fill).polygon(
+        points + [(points[-1][0], fill_bottom), (points[0][0], fill_bottom)],
+        fill=GREEN + (round(255 * FILL_ALPHA),)
+    )
+    plot.alpha_composite(fill)
+    ImageDraw.Draw(plot).line(points, fill=GREEN + (255,), width=round(LINE_WIDTH * SUPERSAMPLE), joint="curve")
+
+    canvas = Image.new("RGBA", (WIDTH * SUPERSAMPLE, HEIGHT * SUPERSAMPLE), (0, 0, 0, 0))
+    canvas.paste(plot, (left, top))
+    canvas = canvas.resize((WIDTH, HEIGHT), Image.LANCZOS)
+
+    return encode(canvas)
+
+def normalize(closes):
+    """Percent change from the first close, what /compare plots so every line starts at 0"""
+    first = closes[0]
+    if not first:
+        return [0.0] * len(closes)
+    return [(close / first - 1) * 100 for close in closes]
+
+def draw_comparison(lines, backend=CHART_BACKEND):
+    """Render normalized (timestamps, percents) lines on one chart, coloured in COMPARE_COLORS order.
+
+    A None line keeps its colour unused so the rest still match the embed.
+    """
+    if backend == "pillow":
+        return draw_comparison_pillow(lines)
+    return draw_comparison_matplotlib(lines)
+
+def draw_comparison_matplotlib(lines):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 5), facecolor="none")
+    ax = fig.add_subplot()
+    for line, (_, color) in zip(lines, COMPARE_COLORS):
+        if line is None:
+            continue
+        timestamps, percents = line
+        times = [datetime.datetime.fromtimestamp(timestamp) for timestamp in timestamps]
+        ax.plot(times, percents, linestyle="-", color=tuple(c / 255 for c in color), linewidth=4)
+
+    grey = tuple(c / 255 for c in AXIS_GREY)
+    ax.axhline(0, color=grey, linewidth=1, linestyle="--")
+    ax.yaxis.set_major_formatter("{x:+.0f}%")
+    ax.tick_params(colors=grey, labelsize=14)
+    ax.set_xticks([])
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+    return encode_figure(fig)
+
+def draw_comparison_pillow(lines):
+    """Same chart as draw_comparison_matplotlib without the tick labels in between, just the range"""
+    from PIL import Image, ImageDraw, ImageFont
+
+    left, top, right, bottom = (edge * SUPERSAMPLE for edge in PLOT_BOX)
+    plot_width, plot_height = right - left, bottom - top
+
+    lines = [line and downsample(*line, PLOT_BOX[2] - PLOT_BOX[0]) for line in lines]
+    drawn = [line for line in lines if line]
+    t_min = min(times[0] for times, _ in drawn)
+    t_span = (max(times[-1] for times, _ in drawn) - t_min) or 1
+    # The 0% baseline is always in view
+    p_min = min(0.0, min(min(percents) for _, percents in drawn))
+    p_max = max(0.0, max(max(percents) for _, percents in drawn))
+    p_span = (p_max - p_min) or 1
+
+    def to_xy(timestamp, percent):
+        return (timestamp - t_min) / t_span * plot_width, (p_max - percent) / p_span * plot_height
+
+    canvas = Image.new("RGBA", (WIDTH * SUPERSAMPLE, HEIGHT * SUPERSAMPLE), (0, 0, 0, 0))
+    plot = Image.new("RGBA", (plot_width, plot_height), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(plot)
+
+    baseline = to_xy(t_min, 0)[1]
+    for x in range(0, plot_width, 12 * SUPERSAMPLE):
+        draw.line([(x, baseline), (x + 6 * SUPERSAMPLE, baseline)], fill=AXIS_GREY + (255,), width=SUPERSAMPLE)
+    for line, (_, color) in zip(lines, COMPARE_COLORS):
+        if not line:
+            continue
+        times, percents = line
+        points = [to_xy(timestamp, percent) for timestamp, percent in zip(times, percents)]
+        if len(points) == 1:
+            points.append((plot_width, points[0][1]))
+        draw.line(points, fill=color + (255,), width=4 * SUPERSAMPLE, joint="curve")
+    canvas.paste(plot, (left, top))
+
+    try:
+        font = ImageFont.load_default(size=14 * SUPERSAMPLE)
+    except TypeError:
+        # Pillow < 10.1 only has the fixed size bitmap font
+        font = ImageFont.load_default()
+    labels = ImageDraw.Draw(canvas)
+    for percent, y in ((p_max, top), (0.0, top + baseline), (p_min, bottom)):
+        # The range ends only get a label when they're clear of the baseline's
+        if percent and abs(y - top - baseline) < 24 * SUPERSAMPLE:
+            continue
+        labels.text((left - 8 * SUPERSAMPLE, y), f"{percent:+.0f}%", fill=AXIS_GREY + (255,), font=font, anchor="rm")
+    canvas = canvas.resize((WIDTH, HEIGHT), Image.LANCZOS)
 
-    return img_io
+    return encode(canvas)
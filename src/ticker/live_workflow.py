@@ -0,0 +1,53 @@
+from src.Bot import Bot
+from src.ticker.utils import get_ticker_candles, get_currencies, build_currency_views
+from src.ticker.ticker_workflow import fill_high_low, render_chart
+from src.ticker.ui_ticker_workflow import build_ticker_embed, embed_signature
+
+async def refresh_live(bot: Bot, asset_id, subscriptions):
+    """One fetch and one render for every live message on the asset, then an edit for each that changed"""
+    # Any of the messages will do for logging
+    interaction = subscriptions[0].interaction
+
+    token = await bot.ticker_data.refresh_asset(asset_id)
+    if token is None:
+        return
+    candles = await get_ticker_candles(interaction, bot, token, 7)
+    if candles:
+        fill_high_low(token, candles)
+        await render_chart(interaction, bot, token, candles)
+    # Only a render that produced bytes replaces the chart. Busy, timed out or an empty
+    # window keeps the one the messages already show, like revalidate does
+    rendered = token.graph
+    if rendered is None:
+        token.graph = next((subscription.graph for subscription in subscriptions if subscription.graph is not None), None)
+
+    currencies, stale_rates = await get_currencies(interaction, bot)
+    if currencies is None:
+        return
+    views = build_currency_views(currencies, token)
+
+    for subscription in subscriptions:
+        embed, attachments = build_ticker_embed(views, subscription.currency, token, stale_rates, live=True)
+        signature = embed_signature(embed)
+        chart_changed = rendered is not None and rendered != subscription.graph
+        if signature == subscription.signature and not chart_changed:
+            bot.live.skipped += 1
+            continue
+
+        subscription.signature = signature
+        if chart_changed:
+            subscription.graph = rendered
+        if subscription.view is not None:
+            subscription.view.views = views
+            subscription.view.token = token
+            subscription.view.stale_rates = stale_rates
+        bot.live.schedule(subscription, edit(subscription, embed, attachments if chart_changed else None))
+
+def edit(subscription, embed, attachments):
+    async def send():
+        # Without attachments the message keeps the ones it has, the chart isn't uploaded again
+        if attachments is None:
+            await subscription.interaction.edit_original_response(embed=embed)
+        else:
+            await subscription.interaction.edit_original_response(embed=embed, attachments=attachments)
+    return send
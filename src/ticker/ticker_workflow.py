@@ -1,47 +1,168 @@
+import asyncio
 import discord
 
 from src.Bot import Bot
 from src.ticker.TokenInfo import TokenInfo
-from src.ticker.graph import get_graph
+from src.ticker.CandleSeries import CandleSeries, DAY, WEEK
+from src.ticker.RenderService import RenderBusy
 from src.ticker.utils import (
-    calculate_percentage_change, get_ticker_info, 
-    get_ticker_candles, find_highest_and_lowest,
-    get_currencies
+    get_ticker_info, get_ticker_candles, get_cached_candles,
+    get_currencies, build_currency_views
 )
 from src.ticker.ui_ticker_workflow import ticker_ui
+from src.vestige.rate_limiter import Priority, set_priority
+from consts import INFO_PRICE_FRESH, INFO_PRICE_STALE, INFO_CHART_FRESH, INFO_CHART_STALE, INFO_MATERIAL_CHANGE
 
-from src.logger import notify_admin
+from src.logger import notify_bot, notify_admin
+from src.metrics import STAGE_SECONDS, INFO_RESPONSES
 
-async def ticker_workflow(interaction: discord.Interaction, bot: Bot, ticker: str):
+# Revalidations outlive their command on purpose, hold on to them until they finish
+revalidations = set()
+
+async def settle(interaction, task, label):
+    """Await an optional stage, a failure there only drops that piece of the embed"""
     try:
-        # Get Algo price in currencies
-        currencies = await get_currencies(interaction, bot)
-        if currencies == None:
-            await interaction.edit_original_response(content="Problem pulling algos current price.")
-            return None
-        # del currencies["BTC"] # its like allllll zeros
-        currencies["ALGO"] = 1
+        return await task
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        notify_bot(interaction, f"{label} failed :: {e}")
+        return None
+
+def fill_high_low(token, candles):
+    token.highest_7d, token.lowest_7d = candles.high_low(WEEK) or (token.price, token.price)
+    # No trades in the last day means it sat at the current price
+    token.highest_24h, token.lowest_24h = candles.high_low(DAY) or (token.price, token.price)
+
+async def render_chart(interaction, bot, token, candles):
+    try:
+        with STAGE_SECONDS.time(command="info", stage="render"):
+            token.graph = await bot.renderer.render(candles, WEEK, asset_id=token.asset_id)
+    except (RenderBusy, asyncio.TimeoutError) as e:
+        # Under a burst the embed goes out without the chart rather than waiting
+        notify_bot(interaction, f"chart skipped :: {e!r}")
+
+def moved(shown, token):
+    """Whether any number in the embed changed by more than INFO_MATERIAL_CHANGE"""
+    for name in ("price", "highest_24h", "lowest_24h", "highest_7d", "lowest_7d"):
+        old, new = getattr(shown, name), getattr(token, name)
+        if old is None or new is None or old == 0:
+            if old != new:
+                return True
+        elif abs(new - old) / abs(old) >= INFO_MATERIAL_CHANGE:
+            return True
+    return False
+
+async def revalidate(interaction, bot, shown, view, currencies, stale_rates, price_stale, chart_stale):
+    """Background half of stale-while-revalidate, edits the response in place if the numbers moved.
+
+    `view` is the TickerView sent with `shown`. Once it's finished the user has
+    clicked to another currency or gone live (or it timed out), that message
+    is theirs now and is left alone.
+    """
+    set_priority(Priority.BACKGROUND)
+    try:
+        with STAGE_SECONDS.time(command="info", stage="revalidate"):
+            token = shown.copy()
+            if price_stale:
+                token = await bot.ticker_data.refresh_asset(shown.asset_id) or token
+
+            if chart_stale:
+                candles = await get_ticker_candles(interaction, bot, token, 7)
+            else:
+                candles, _ = await get_cached_candles(bot, token, 7)
+            if candles:
+                fill_high_low(token, candles)
+
+            if not moved(shown, token):
+                INFO_RESPONSES.inc(result="revalidated_unchanged")
+                return
 
-        
+            token.graph = shown.graph
+            if candles:
+                await render_chart(interaction, bot, token, candles)
+            if view.is_finished():
+                INFO_RESPONSES.inc(result="revalidated_superseded")
+                return
+            views = build_currency_views(currencies, token)
+            # Replaced by ours, its timeout must not strip the new buttons
+            view.stop()
+            # A chart that rendered the same is already on the message
+            await ticker_ui(interaction, views, view.current, token, stale_rates, bot, view.subscription,
+                            reuse_attachments=token.graph == shown.graph)
+            INFO_RESPONSES.inc(result="revalidated_edited")
+
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        # The stale response stays up, it was good enough to send
+        notify_bot(interaction, f"revalidate failed :: {e}")
+
+async def ticker_workflow(interaction: discord.Interaction, bot: Bot, ticker: str):
+    # Currencies (cached) and the token lookup don't depend on each other, start both right away
+    currencies_task = asyncio.create_task(get_currencies(interaction, bot))
+    token_task = asyncio.create_task(get_ticker_info(interaction, bot, ticker.lower()))
+    candles_task = None
+    try:
         # Get ticker/token data
-        token: TokenInfo = await get_ticker_info(interaction, bot, ticker.lower())
+        with STAGE_SECONDS.time(command="info", stage="token"):
+            token: TokenInfo = await token_task
         if token == None:
             await interaction.edit_original_response(content="Ticker not found")
             return None
 
-        # Get candles for 7 days
-        candles = await get_ticker_candles(interaction, token, 7)
+        bot.warmer.record(token.asset_id)
+
+        # Stale-while-revalidate, a price past INFO_PRICE_STALE is too old to show at all
+        price_age = bot.ticker_data.age(token.asset_id)
+        if price_age > INFO_PRICE_STALE:
+            with STAGE_SECONDS.time(command="info", stage="token_refresh"):
+                refreshed = await settle(interaction, bot.ticker_data.refresh_asset(token.asset_id), "token refresh")
+            if refreshed:
+                token, price_age = refreshed, 0
 
-        # Get candles for 24 days, only for the high/low
-        candles_24 = await get_ticker_candles(interaction, token, 1)
+        # Same for the candles, a stored series that's only slightly old is shown as is
+        # Candles for 7 days, the 24h window is a suffix of the same series
+        candles, chart_age = await get_cached_candles(bot, token, 7)
+        if candles is None or chart_age > INFO_CHART_STALE:
+            # Candles only need the token, run them while the currencies finish
+            candles_task = asyncio.create_task(get_ticker_candles(interaction, bot, token, 7))
+
+        # Get Algo price in currencies
+        with STAGE_SECONDS.time(command="info", stage="currencies"):
+            currencies, stale_rates = await currencies_task
+        if currencies == None:
+            await interaction.edit_original_response(content="Problem pulling algos current price.")
+            return None
+
+        if candles_task:
+            with STAGE_SECONDS.time(command="info", stage="candles"):
+                candles: CandleSeries = await settle(interaction, candles_task, "candles")
+            chart_age = 0
 
         if candles:
-            token.highest_7d, token.lowest_7d = find_highest_and_lowest(candles)
-            token.highest_24h, token.lowest_24h = find_highest_and_lowest(candles_24)
-            token.graph = get_graph(candles)
-            
-        await ticker_ui(interaction, currencies, "USD", token)
+            fill_high_low(token, candles)
+            await render_chart(interaction, bot, token, candles)
+
+        views = build_currency_views(currencies, token)
+        view = await ticker_ui(interaction, views, "USD", token, stale_rates, bot)
+
+        # Respond first, then bring anything past its fresh age up to date
+        price_stale = price_age > INFO_PRICE_FRESH
+        chart_stale = candles is not None and chart_age > INFO_CHART_FRESH
+        INFO_RESPONSES.inc(result="stale" if price_stale or chart_stale else "fresh")
+        if price_stale or chart_stale:
+            task = asyncio.create_task(
+                revalidate(interaction, bot, token, view, currencies, stale_rates, price_stale, chart_stale))
+            revalidations.add(task)
+            task.add_done_callback(revalidations.discard)
 
     except Exception as e:
         await interaction.edit_original_response(content="Something bad happened, and I need an adult...")
         await notify_admin(interaction, bot, f"Ticker: {ticker} :: Reason: {e}")
+
+    finally:
+        # Nothing outlives the command, early returns and errors cancel whatever is still in flight
+        for task in (currencies_task, token_task, candles_task):
+            if task and not task.done():
+                task.cancel()
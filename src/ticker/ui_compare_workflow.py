@@ -0,0 +1,39 @@
+import discord
+
+from src.ticker.graph import COMPARE_COLORS
+from src.ticker.attachments import logo_file, chart_file, chart_name, LOGO_NAME
+from src.metrics import STAGE_SECONDS
+
+async def compare_ui(interaction, tokens, views, charted, graph, stale_rates=False):
+    """One embed for every compared token, `views` are their USD CurrencyViews"""
+    embed = discord.Embed(
+        title="Compare " + ", ".join(f"${token.ticker.lstrip('$')}" for token in tokens),
+        colour=discord.Colour.green(),
+        description="7d price change, every line starts at 0%"
+    )
+
+    for token, view, has_chart, (square, _) in zip(tokens, views, charted, COMPARE_COLORS):
+        value = f"**Price:** {view.price}\n"
+        value += f"**24h:** {view.change_24_hrs}\n"
+        value += f"**7d:** {view.change_7_days}\n"
+        value += f"**Market Cap:** {view.market_cap}"
+        if not has_chart:
+            value += "\n*not on the chart*"
+        embed.add_field(name=f"{square} {token.ticker} • {token.asset_name}", value=value, inline=True)
+
+    attachments = []
+    if graph:
+        embed.set_image(url=f"attachment://{chart_name('compare')}")
+        attachments.append(chart_file(graph, "compare"))
+
+    footer = "Powered by Vestige, Built by evilcorp.algo"
+    if stale_rates:
+        footer += " • conversion rates may be delayed"
+    embed.set_footer(
+        icon_url=f"attachment://{LOGO_NAME}",
+        text=footer
+    )
+    attachments.append(logo_file())
+
+    with STAGE_SECONDS.time(command="compare", stage="edit"):
+        await interaction.edit_original_response(embed=embed, attachments=attachments)
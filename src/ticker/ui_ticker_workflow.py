@@ -1,27 +1,65 @@
-import discord, copy
+import discord
 
-from src.ticker.utils import conversion
+from src.ticker.attachments import logo_file, chart_file, chart_name, LOGO_NAME
+from src.metrics import STAGE_SECONDS
+from src.vestige.rate_limiter import Priority, set_priority
 
 class TickerView(discord.ui.View):
-    def __init__(self, message, currencies, current, token, timeout):
+    def __init__(self, message, views, current, token, stale_rates, timeout, bot=None, subscription=None):
         super().__init__(timeout=timeout)
         self.message = message
+        # Live refreshes swap these out so the buttons always show the latest numbers
+        self.views = views
+        self.token = token
+        self.current = current
+        self.stale_rates = stale_rates
+        self.bot = bot
+        self.subscription = subscription
 
-        for currency, _ in currencies.items():
+        for currency in views:
             if currency != current:
-                self.add_currency_button(currency, currencies, token)
+                self.add_currency_button(currency)
+        if bot is not None:
+            self.add_live_button()
 
-    def add_currency_button(self, currency, currencies, token):
+    def add_currency_button(self, currency):
         button = discord.ui.Button(
-            label=currency, 
+            label=currency,
             style=discord.ButtonStyle.primary,
             custom_id=f"currency_{currency}"
         )
-        
+
         async def btn_callback(interaction):
+            set_priority(Priority.BUTTON)
             await interaction.response.defer()
-            await ticker_ui(interaction, currencies, currency, token)
-            
+            # Replaced by the next view, its timeout must not strip the new buttons
+            self.stop()
+            # Same chart as the message already has, only the numbers change
+            await ticker_ui(interaction, self.views, currency, self.token, self.stale_rates, self.bot, self.subscription, reuse_attachments=True)
+
+        button.callback = btn_callback
+        self.add_item(button)
+
+    def add_live_button(self):
+        live = self.subscription is not None
+        button = discord.ui.Button(
+            label="Stop live" if live else "Go live",
+            style=discord.ButtonStyle.danger if live else discord.ButtonStyle.success,
+            custom_id="live"
+        )
+
+        async def btn_callback(interaction):
+            set_priority(Priority.BUTTON)
+            await interaction.response.defer()
+            self.stop()
+            if live:
+                self.bot.live.unsubscribe(self.subscription)
+                subscription = None
+            else:
+                # None when too many messages are live already, the message just stays static
+                subscription = self.bot.live.subscribe(interaction, self.token.asset_id, self.current)
+            await ticker_ui(interaction, self.views, self.current, self.token, self.stale_rates, self.bot, subscription, reuse_attachments=True)
+
         button.callback = btn_callback
         self.add_item(button)
 
@@ -29,57 +67,91 @@ class TickerView(discord.ui.View):
         return interaction.user.id == self.message.user.id
 
     async def on_timeout(self):
+        if self.subscription is not None:
+            self.bot.live.unsubscribe(self.subscription)
         await self.message.edit_original_response(view=None)
 
-async def ticker_ui(interaction, currencies, currency, token):
-        
-        converted_token = conversion(currencies, currency, token)
+def build_ticker_embed(views, currency, token, stale_rates=False, live=False):
+    """The /info embed and its attachments for one currency"""
+    # Precomputed by build_currency_views, nothing is converted or copied here
+    converted_token = views[currency]
 
-        # Make it pretty
-        embed =  discord.Embed(
-            title=f"Buy more ${token.ticker.lstrip('$')}",
-            colour = discord.Colour.green(),
-            url= f"https://vestige.fi/swap?asset_in=0&asset_out={token.asset_id}"
+    # Make it pretty
+    embed =  discord.Embed(
+        title=f"Buy more ${token.ticker.lstrip('$')}",
+        colour = discord.Colour.green(),
+        url= f"https://vestige.fi/swap?asset_in=0&asset_out={token.asset_id}"
+    )
+    embed.add_field(name="Name", value=token.asset_name, inline=True)
+    embed.add_field(name="Ticker", value=token.ticker, inline=True)
+    embed.add_field(name="Rank", value=token.rank, inline=True)
+    embed.add_field(name="Price", value=converted_token.price, inline=False)
+
+    embed.add_field(name="24h Price Change", value=converted_token.change_24_hrs, inline=True)
+    # embed.add_field(name="\u200b", value="\u200b", inline=True)
+    embed.add_field(name="7d Price Change", value=converted_token.change_7_days, inline=True)
+
+    embed.add_field(name="24h High", value=converted_token.highest_24h, inline=True)
+    # embed.add_field(name="\u200b", value="\u200b", inline=True)
+    embed.add_field(name="7d High", value=converted_token.highest_7d, inline=True)
+
+    embed.add_field(name="24h Low", value=converted_token.lowest_24h, inline=True)
+    # embed.add_field(name="\u200b", value="\u200b", inline=True)
+    embed.add_field(name="7d Low", value=converted_token.lowest_7d, inline=True)
+
+    embed.add_field(name="24h Volume", value=converted_token.volume1d, inline=True)
+    # embed.add_field(name="\u200b", value="\u200b", inline=True)
+    embed.add_field(name="Market Cap", value=converted_token.market_cap, inline=True)
+
+    attachments = []
+    if token.graph:
+        embed.set_image(
+            url=f"attachment://{chart_name('graph')}"
         )
-        embed.add_field(name="Name", value=token.asset_name, inline=True)
-        embed.add_field(name="Ticker", value=token.ticker, inline=True)
-        embed.add_field(name="Rank", value=token.rank, inline=True)
-        embed.add_field(name="Price", value=converted_token.price, inline=False)
-
-        embed.add_field(name="24h Price Change", value=converted_token.change_24_hrs, inline=True)
-        # embed.add_field(name="\u200b", value="\u200b", inline=True)
-        embed.add_field(name="7d Price Change", value=converted_token.change_7_days, inline=True)
-
-        embed.add_field(name="24h High", value=converted_token.highest_24h, inline=True)
-        # embed.add_field(name="\u200b", value="\u200b", inline=True)
-        embed.add_field(name="7d High", value=converted_token.highest_7d, inline=True)
-        
-        embed.add_field(name="24h Low", value=converted_token.lowest_24h, inline=True)
-        # embed.add_field(name="\u200b", value="\u200b", inline=True)
-        embed.add_field(name="7d Low", value=converted_token.lowest_7d, inline=True)
-        
-        embed.add_field(name="24h Volume", value=converted_token.volume1d, inline=True)
-        # embed.add_field(name="\u200b", value="\u200b", inline=True)
-        embed.add_field(name="Market Cap", value=converted_token.market_cap, inline=True)
-
-        attachments = []    
-        if token.graph:
-            token.graph.seek(0)
-            embed.set_image(
-                url="attachment://graph.png"
-            )
-            attachments.append(discord.File(token.graph, "graph.png"))
-        if token.image:
-            embed.set_thumbnail(
-                url=token.image
-            )
-
-        embed.set_footer(
-            icon_url="attachment://vestige.png",
-            text="Powered by Vestige, Built by evilcorp.algo"
+        # Cached chart bytes go out as is, no re-encoding
+        attachments.append(chart_file(token.graph, "graph"))
+    if token.image:
+        embed.set_thumbnail(
+            url=token.image
         )
-        attachments.append(discord.File(fp="./images/logo.png", filename="vestige.png"))
 
-        view = TickerView(interaction, currencies, currency, token, 120)
+    footer = "Powered by Vestige, Built by evilcorp.algo"
+    if stale_rates and currency != "ALGO":
+        footer += " • conversion rates may be delayed"
+    if live:
+        footer += " • 🔴 live"
+    embed.set_footer(
+        icon_url=f"attachment://{LOGO_NAME}",
+        text=footer
+    )
+    attachments.append(logo_file())
+
+    return embed, attachments
+
+def embed_signature(embed):
+    """Everything visible in the embed apart from the images, equal signatures mean a no-op edit"""
+    return (embed.title, embed.footer.text) + tuple((field.name, field.value) for field in embed.fields)
+
+async def ticker_ui(interaction, views, currency, token, stale_rates=False, bot=None, subscription=None, reuse_attachments=False):
+        """Show `token` in `currency` on the interaction's response.
+
+        With `reuse_attachments` the edit leaves the files out, the message keeps
+        the chart and logo it already uploaded and the embed points at them by name.
+        Returns the TickerView now on the message.
+        """
+
+        embed, attachments = build_ticker_embed(views, currency, token, stale_rates, live=subscription is not None)
+
+        if subscription is not None:
+            # The view lives as long as the live message, each click restarts both
+            view = TickerView(interaction, views, currency, token, stale_rates, bot.live.max_duration, bot, subscription)
+            bot.live.touch(subscription, interaction, currency, view, embed_signature(embed), token.graph)
+        else:
+            view = TickerView(interaction, views, currency, token, stale_rates, 120, bot)
 
-        await interaction.edit_original_response(embed=embed, attachments=attachments, view=view) 
\ No newline at end of file
+        with STAGE_SECONDS.time(command="info", stage="edit"):
+            if reuse_attachments:
+                await interaction.edit_original_response(embed=embed, view=view)
+            else:
+                await interaction.edit_original_response(embed=embed, attachments=attachments, view=view)
+        return view
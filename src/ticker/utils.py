@@ -1,110 +1,96 @@
-import aiohttp, time, copy
+import asyncio, time
+from types import MappingProxyType
+from typing import NamedTuple
 
 from src.Bot import Bot
-from src.ticker.TokenInfo import TokenInfo
-from consts import NETWORK_ID, HEADERS, SEARCH_URL
+from src.ticker.TokenInfo import TokenInfo, TokenBatch, normalize_ticker
+from src.ticker.CandleStore import candle_interval, window_start
+from consts import SEARCH_URL, INFO_PRICE_STALE
 
 from src.logger import notify_bot, notify_admin
 
 async def get_currencies(interaction, bot):
-    currencies = {}
-    
-    # Define assets to fetch: Currency Name -> Asset ID
-    # USDC: 31566704, EURS: 227855942
-    assets = {
-        "USD": 31566704,
-        "EUR": 227855942
-    }
-
-    try:
-        conn = aiohttp.TCPConnector(limit=None, ttl_dns_cache=300)
-        async with aiohttp.ClientSession(connector=conn) as session:
-            for currency, asset_id in assets.items():
-                url = f"https://api.vestigelabs.org/assets/search?network_id={NETWORK_ID}&query={asset_id}&limit=1"
-                async with session.get(url=url, headers=HEADERS) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        results = data.get("results", [])
-                        if results:
-                            # Price is ALGOs per unit of currency (e.g. 3.3 Algos per USDC)
-                            price_in_algo = results[0]["price"]
-                            if price_in_algo > 0:
-                                currencies[currency] = 1.0 / price_in_algo
-                            else:
-                                currencies[currency] = 0
-                    else:
-                        print(f"Error fetching {currency}: {response.status}")
-        
-    except Exception as e:
-        await notify_admin(interaction, bot, f"error processing currencies :: {e}")
-        return None
-
-    return currencies
-
-async def get_ticker_candles(interaction, token: TokenInfo, start_num_days_ago):
+    """Algo price in each currency from the rate cache, plus whether it's stale"""
+    if not bot.rates.rates:
+        # Nothing loaded yet (startup refresh failed), this is the only time a reader waits
+        try:
+            await bot.rates.refresh()
+        except Exception as e:
+            await notify_admin(interaction, bot, f"error processing currencies :: {e}")
+            return None, True
+        if not bot.rates.rates:
+            await notify_admin(interaction, bot, "error processing currencies :: no rates available")
+            return None, True
+
+    return bot.rates.snapshot()
+
+async def get_ticker_candles(interaction, bot, token: TokenInfo, start_num_days_ago):
     now = int(time.time())
-    age = now - token.creation_timestamp
-
-    if age <= 1800:     # 30 mins
-        interval = 30
-    elif age <= 3600:   # 1 hour
-        interval = 60    
-    elif age <= 86400:  # 1 day
-        interval = 300 
-    else:
-        interval = 7200
+    interval = candle_interval(token, now)
 
-    start = now - start_num_days_ago * 24 * 3600  # 7 days in seconds
+    start = window_start(interval, start_num_days_ago * 24 * 3600, now)
 
-    url = (f"https://api.vestigelabs.org/assets/{token.asset_id}/candles?"
-           f"network_id={NETWORK_ID}&interval={interval}&start={start}"
-           f"&denominating_asset_id=0&volume_in_denominating_asset=false")
-    
-    conn = aiohttp.TCPConnector(limit=None, ttl_dns_cache=300)
-    session = aiohttp.ClientSession(connector=conn)
-    async with session.get(url=url, headers=HEADERS) as response:
-        if response.status == 200:
-            candles = await response.json()
-        else:
-            notify_bot(interaction, f"error processing candles :: {response}")
-            await session.close()
-            return None
-    await session.close()  
+    # Served from the candle store, only the candles since the last lookup are fetched
+    status, candles = await bot.candles.get(token.asset_id, interval, start)
+    if status != 200:
+        notify_bot(interaction, f"error processing candles :: {status}")
 
     if not candles: return None
     
     return candles
 
+async def get_cached_candles(bot, token: TokenInfo, start_num_days_ago):
+    """(series, age) from the candle store without fetching, (None, None) when it doesn't cover the window"""
+    now = int(time.time())
+    interval = candle_interval(token, now)
+    start = window_start(interval, start_num_days_ago * 24 * 3600, now)
+    return await bot.candles.cached(token.asset_id, interval, start)
+
 async def get_ticker_info(interaction, bot, ticker):
-    conn = aiohttp.TCPConnector(limit=None, ttl_dns_cache=300)
-    session = aiohttp.ClientSession(connector=conn)
-    async with session.get(url=SEARCH_URL.format(ticker), headers=HEADERS) as response:
-        if response.status == 200:
-            data = await response.json()
-            token_data = data.get("results",[])
-        else:
-            notify_bot(interaction, f"error processing ticker :: {response}")
-            await session.close()
-            return None
-    await session.close()  
-
-    tokens = []
-    # Exact Match or people who add a $ in their ticker...
-    for token in token_data:
-        token_info = TokenInfo(token)
-        if ticker.lower() == token_info.ticker.lower().strip() or f"${ticker.lower()}" == token_info.ticker.lower().strip():
-            tokens.append(token_info)
-    # Highest rank "exact matching" ticker wings
-    if tokens:
-        highest_rank_token = min(tokens, key=lambda x: x.rank)
-        return highest_rank_token
+    # Local index first, it covers the ranked universe
+    token = bot.ticker_data.lookup(ticker)
+    if token:
+        return token
+
+    return await search_ticker(interaction, bot, ticker)
+
+async def get_fresh_token(interaction, bot, token: TokenInfo, max_age=INFO_PRICE_STALE):
+    """The token, re-fetched first when its price is older than `max_age`, a failed refresh keeps the one we had"""
+    if bot.ticker_data.age(token.asset_id) <= max_age:
+        return token
+    try:
+        return await bot.ticker_data.refresh_asset(token.asset_id) or token
+    except Exception as e:
+        notify_bot(interaction, f"token refresh failed :: {e}")
+        return token
+
+async def get_ticker_infos(interaction, bot, tickers):
+    """TokenInfo (or None) per ticker, one index pass then the misses searched side by side"""
+    tokens = [bot.ticker_data.lookup(ticker) for ticker in tickers]
+    misses = [i for i, token in enumerate(tokens) if token is None]
+    if misses:
+        found = await asyncio.gather(*(search_ticker(interaction, bot, tickers[i]) for i in misses))
+        for i, token in zip(misses, found):
+            tokens[i] = token
+    return tokens
+
+async def search_ticker(interaction, bot, ticker):
+    """Remote search for a ticker the index doesn't know, remembered in the index afterwards"""
+    status, data = await bot.vestige.get_shared(SEARCH_URL.format(normalize_ticker(ticker)))
+    if status == 200:
+        token_data = data.get("results",[])
     else:
+        notify_bot(interaction, f"error processing ticker :: {status}")
         return None
 
-def find_highest_and_lowest(candles):
-    highest_high = max(item["high"] for item in candles)
-    lowest_low = min(item["low"] for item in candles)
-    return highest_high, lowest_low
+    # Exact Match or people who add a $ in their ticker, the highest ranked one wins and
+    # is the only row built into a TokenInfo, remembered for next time
+    best = TokenBatch(token_data).best_match(ticker)
+    if best is not None:
+        bot.ticker_data.add(best)
+
+    # The index has the final say, an asset it already knew may outrank it
+    return bot.ticker_data.lookup(ticker)
 
 def calculate_percentage_change(current_price, price_24hr_ago, price_7days_ago):
     def percentage_change(new_price, old_price):
@@ -116,31 +102,54 @@ def calculate_percentage_change(current_price, price_24hr_ago, price_7days_ago):
     change_7days = percentage_change(current_price, price_7days_ago)
     return change_24hr, change_7days
 
-def conversion(currencies, currency, token):
-    converted_token: TokenInfo = copy.deepcopy(token)
-
-    postfix = ""
-    if currency == "ALGO":
-        postfix = " Ⱥ"
-    elif currency == "USD":
-        postfix = " $"
-    elif currency == "EUR":
-        postfix = " €"
-    elif currency == "GBP":
-        postfix = " £"
-    else:
-        postfix = " ?"
-
-    token.change_24_hrs, token.change_7_days = calculate_percentage_change(
-        token.price*currencies[currency], token.price1d*currencies[currency], token.price7d*currencies[currency])
-
-    converted_token.price = f"{token.price*currencies[currency]:,.8f}{postfix}"
-    converted_token.highest_24h = f"{token.highest_24h*currencies[currency]:,.8f}{postfix}"
-    converted_token.highest_7d = f"{token.highest_7d*currencies[currency]:,.8f}{postfix}"
-    converted_token.lowest_24h = f"{token.lowest_24h*currencies[currency]:,.8f}{postfix}"
-    converted_token.lowest_7d = f"{token.lowest_7d*currencies[currency]:,.8f}{postfix}"
-    converted_token.change_24_hrs = f"{token.change_24_hrs:,.2f}%"
-    converted_token.change_7_days = f"{token.change_7_days:,.2f}%"
-    converted_token.volume1d = f"{token.volume1d*currencies[currency]:,.3f}{postfix}"
-    converted_token.market_cap = f"{token.market_cap*currencies[currency]:,.3f}{postfix}"
-    return converted_token
\ No newline at end of file
+POSTFIXES = {
+    "ALGO": " Ⱥ",
+    "USD": " $",
+    "EUR": " €",
+    "GBP": " £"
+}
+
+class CurrencyView(NamedTuple):
+    """A token's embed fields formatted in one currency"""
+    price: str
+    change_24_hrs: str
+    change_7_days: str
+    highest_24h: str
+    highest_7d: str
+    lowest_24h: str
+    lowest_7d: str
+    volume1d: str
+    market_cap: str
+
+def format_amount(amount, rate, decimals, postfix):
+    if amount is None:
+        return "N/A"
+    return f"{amount*rate:,.{decimals}f}{postfix}"
+
+def format_change(change):
+    if change is None:
+        return "N/A"
+    return f"{change:,.2f}%"
+
+def build_currency_views(currencies, token: TokenInfo):
+    """Every currency rendering of the token, computed once so button clicks are a lookup.
+
+    Percent changes don't depend on the currency, they're worked out once in ALGO.
+    """
+    change_24_hrs, change_7_days = calculate_percentage_change(token.price, token.price1d, token.price7d)
+
+    views = {}
+    for currency, rate in currencies.items():
+        postfix = POSTFIXES.get(currency, " ?")
+        views[currency] = CurrencyView(
+            price=format_amount(token.price, rate, 8, postfix),
+            change_24_hrs=format_change(change_24_hrs),
+            change_7_days=format_change(change_7_days),
+            highest_24h=format_amount(token.highest_24h, rate, 8, postfix),
+            highest_7d=format_amount(token.highest_7d, rate, 8, postfix),
+            lowest_24h=format_amount(token.lowest_24h, rate, 8, postfix),
+            lowest_7d=format_amount(token.lowest_7d, rate, 8, postfix),
+            volume1d=format_amount(token.volume1d, rate, 3, postfix),
+            market_cap=format_amount(token.market_cap, rate, 3, postfix)
+        )
+    return MappingProxyType(views)
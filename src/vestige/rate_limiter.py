@@ -0,0 +1,175 @@
+import asyncio, itertools, time
+from contextvars import ContextVar
+from enum import IntEnum
+from heapq import heappush, heappop
+
+from src.metrics import UPSTREAM_WAIT_SECONDS
+
+class Priority(IntEnum):
+    """Who is waiting on a Vestige call, lower goes first under contention"""
+    INTERACTIVE = 0 # /info
+    BUTTON = 1      # button clicks on an existing message
+    BROWSE = 2      # /pools, /swap
+    BACKGROUND = 3  # refreshers and warmers
+
+# Set once per command or background loop, every Vestige call made from that context inherits it
+current_priority = ContextVar("vestige_priority", default=Priority.INTERACTIVE)
+
+def set_priority(priority: Priority):
+    current_priority.set(priority)
+
+class SharedPriority:
+    """Priority of one call made on behalf of several callers, the best of theirs.
+
+    A coalesced request starts at its first caller's priority, `raise_to`
+    moves it up as better callers join, requeueing it if it's waiting on a
+    limiter at the time.
+    """
+    __slots__ = ("priority", "waiting")
+
+    def __init__(self, priority):
+        self.priority = priority
+        # (limiter, future) while the call is queued for a token
+        self.waiting = None
+
+    def raise_to(self, priority):
+        if priority >= self.priority:
+            return
+        self.priority = priority
+        if self.waiting is not None:
+            limiter, future = self.waiting
+            limiter.requeue(future, priority)
+
+# Set inside a coalesced call, takes over from current_priority for its limiter waits
+current_shared = ContextVar("vestige_shared_priority", default=None)
+
+class RateLimiter:
+    """Token bucket in front of every Vestige call with a priority queue for waiters.
+
+    Calls go straight through while tokens are available. Once the bucket is
+    empty, waiters are released one token at a time, best priority first and
+    FIFO within a priority. `pause` empties the bucket until a Retry-After
+    has passed.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+        # (priority, sequence, future)
+        self.waiters = []
+        self.sequence = itertools.count()
+        self.timer = None
+
+        self.granted = 0
+        self.queued = 0
+        self.pauses = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, priority=None):
+        """Wait for a token, returns how long that took"""
+        shared = current_shared.get()
+        if priority is None:
+            priority = shared.priority if shared is not None else current_priority.get()
+        started = time.monotonic()
+        self.refill(started)
+
+        if not self.waiters and started >= self.paused_until and self.tokens >= 1:
+            self.tokens -= 1
+            self.granted += 1
+            UPSTREAM_WAIT_SECONDS.observe(0, priority=priority.name.lower())
+            return 0.0
+
+        future = asyncio.get_running_loop().create_future()
+        heappush(self.waiters, (priority, next(self.sequence), future))
+        self.queued += 1
+        self.schedule()
+        if shared is not None:
+            shared.waiting = (self, future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            # Granted right as we were cancelled, hand the token back
+            if future.done() and not future.cancelled():
+                self.tokens += 1
+                self.schedule()
+            raise
+        finally:
+            if shared is not None:
+                shared.waiting = None
+                # Raised while waiting, it went out at the better priority
+                priority = min(priority, shared.priority)
+
+        waited = time.monotonic() - started
+        UPSTREAM_WAIT_SECONDS.observe(waited, priority=priority.name.lower())
+        return waited
+
+    def requeue(self, future, priority):
+        """Queue a waiter again at a better priority, its old entry is skipped once it's granted"""
+        if not future.done():
+            heappush(self.waiters, (priority, next(self.sequence), future))
+
+    def pause(self, seconds):
+        """Stop releasing tokens for `seconds`, used for Retry-After"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+        self.tokens = 0.0
+        self.pauses += 1
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+        self.schedule()
+
+    def dispatch(self):
+        self.timer = None
+        now = time.monotonic()
+        self.refill(now)
+        while self.waiters and now >= self.paused_until and self.tokens >= 1:
+            _, _, future = heappop(self.waiters)
+            # Cancelled waiters just fall out of the queue
+            if future.done():
+                continue
+            future.set_result(None)
+            self.tokens -= 1
+            self.granted += 1
+        self.schedule()
+
+    def schedule(self):
+        # Drop cancelled waiters sitting at the head
+        while self.waiters and self.waiters[0][2].done():
+            heappop(self.waiters)
+        if self.timer or not self.waiters:
+            return
+
+        now = time.monotonic()
+        self.refill(now)
+        delay = max(0.0, self.paused_until - now, (1 - self.tokens) / self.rate)
+        self.timer = asyncio.get_running_loop().call_later(delay, self.dispatch)
+
+    def queue_depth(self, priority=None):
+        # A requeued waiter has several entries, it counts once at its best priority
+        seen = set()
+        depth = 0
+        for waiter_priority, _, future in sorted(self.waiters, key=lambda waiter: waiter[:2]):
+            if future.done() or future in seen:
+                continue
+            seen.add(future)
+            if priority is None or waiter_priority == priority:
+                depth += 1
+        return depth
+
+    def stats(self):
+        stats = {
+            "tokens": self.tokens,
+            "granted": self.granted,
+            "queued": self.queued,
+            "pauses": self.pauses,
+            "paused": int(time.monotonic() < self.paused_until)
+        }
+        for priority in Priority:
+            stats[f"queue_depth_{priority.name.lower()}"] = self.queue_depth(priority)
+        return stats
@@ -0,0 +1,68 @@
+import asyncio, time
+
+class SingleFlight:
+    """Coalesces concurrent identical upstream calls into one.
+
+    Callers asking for a key that's already in flight await the same future
+    instead of firing their own request. Successful results can optionally be
+    reused for a short `ttl` after they land.
+    """
+    def __init__(self, ttl=0, reusable=lambda result: True, max_results=1024):
+        self.ttl = ttl
+        self.reusable = reusable
+        self.max_results = max_results
+
+        self.in_flight = {}
+        # key -> (expires_at, result)
+        self.results = {}
+
+        self.calls = 0
+        self.deduplicated = 0
+        self.reused = 0
+
+    async def do(self, key, factory, ttl=None):
+        """Result of `factory()` for this key, shared with every concurrent caller"""
+        cached = self.results.get(key)
+        if cached is not None:
+            if cached[0] > time.monotonic():
+                self.reused += 1
+                return cached[1]
+            del self.results[key]
+
+        task = self.in_flight.get(key)
+        if task is not None:
+            self.deduplicated += 1
+        else:
+            self.calls += 1
+            task = asyncio.ensure_future(factory())
+            self.in_flight[key] = task
+            task.add_done_callback(lambda done: self.land(key, done, self.ttl if ttl is None else ttl))
+
+        # One caller giving up must not cancel the request for everyone else
+        return await asyncio.shield(task)
+
+    def land(self, key, task, ttl):
+        self.in_flight.pop(key, None)
+        if task.cancelled() or task.exception() is not None or not ttl:
+            return
+        result = task.result()
+        if self.reusable(result):
+            if len(self.results) >= self.max_results:
+                self.prune()
+            self.results[key] = (time.monotonic() + ttl, result)
+
+    def prune(self):
+        now = time.monotonic()
+        for key in [key for key, (expires_at, _) in self.results.items() if expires_at <= now]:
+            del self.results[key]
+        # Still full of live entries, drop the oldest
+        while len(self.results) >= self.max_results:
+            del self.results[next(iter(self.results))]
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "deduplicated": self.deduplicated,
+            "reused": self.reused,
+            "in_flight": len(self.in_flight)
+        }
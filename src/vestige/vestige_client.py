@@ -0,0 +1,146 @@
+import asyncio, random, re, time
+import aiohttp
+from urllib.parse import urlsplit
+
+from consts import (
+    HEADERS, VESTIGE_API_URL,
+    VESTIGE_POOL_SIZE, VESTIGE_POOL_SIZE_PER_HOST, VESTIGE_KEEPALIVE,
+    VESTIGE_TIMEOUT, VESTIGE_MAX_RETRIES, VESTIGE_BACKOFF_BASE, VESTIGE_BACKOFF_MAX,
+    SINGLE_FLIGHT_TTL, VESTIGE_RATE, VESTIGE_BURST
+)
+from src.vestige.single_flight import SingleFlight
+from src.vestige.rate_limiter import RateLimiter, SharedPriority, current_priority, current_shared
+from src.metrics import UPSTREAM_SECONDS, UPSTREAM_IN_FLIGHT
+
+# Statuses worth another attempt, everything else is returned to the caller as is
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def retry_after(response):
+    """Seconds from a Retry-After header, None when missing or not in seconds.
+
+    Capped at VESTIGE_BACKOFF_MAX, the pause holds every caller and a bogus
+    header must not stall the bot for minutes.
+    """
+    try:
+        return min(VESTIGE_BACKOFF_MAX, max(0.0, float(response.headers.get("Retry-After", ""))))
+    except ValueError:
+        return None
+
+def endpoint_label(url):
+    """/assets/123/candles -> /assets/{id}/candles, keeps the metric label set small"""
+    return re.sub(r"/\d+(?=/|$)", "/{id}", urlsplit(url).path)
+
+class VestigeClient:
+    """Long-lived Vestige Labs API client shared by every workflow.
+
+    One ClientSession with a bounded keep-alive pool, so lookups reuse warm
+    connections instead of paying DNS + TLS on every command.
+    """
+    def __init__(self, base_url=VESTIGE_API_URL, timeout=VESTIGE_TIMEOUT, max_retries=VESTIGE_MAX_RETRIES):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.session = None
+
+        # Every attempt, retries included, takes a token
+        self.limiter = RateLimiter(VESTIGE_RATE, VESTIGE_BURST)
+
+        # Only 200s are worth reusing
+        self.flights = SingleFlight(SINGLE_FLIGHT_TTL, reusable=lambda result: result[0] == 200)
+        # key -> SharedPriority of the coalesced call in flight
+        self.shared = {}
+
+    async def start(self):
+        """Open the pooled session, safe to call on every on_ready"""
+        if self.session and not self.session.closed:
+            return
+        conn = aiohttp.TCPConnector(
+            limit=VESTIGE_POOL_SIZE,
+            limit_per_host=VESTIGE_POOL_SIZE_PER_HOST,
+            keepalive_timeout=VESTIGE_KEEPALIVE,
+            ttl_dns_cache=300
+        )
+        self.session = aiohttp.ClientSession(connector=conn, headers=HEADERS)
+
+    async def close(self):
+        if self.session and not self.session.closed:
+            await self.session.close()
+        self.session = None
+
+    def url(self, path):
+        if path.startswith("http"):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    async def get(self, path, params=None, timeout=None):
+        """GET a Vestige endpoint, returns (status, json) with json None on non-200.
+
+        429/5xx and connection errors are retried with exponential backoff and
+        full jitter, or after Retry-After when the server sends one. The last
+        failure is returned (or raised) to the caller. Calls queue on the rate
+        limiter at the priority of the calling context.
+        """
+        await self.start()
+        url = self.url(path)
+        request_timeout = aiohttp.ClientTimeout(total=timeout or self.timeout)
+
+        endpoint = endpoint_label(url)
+
+        attempt = 0
+        while True:
+            await self.limiter.acquire()
+            started = time.perf_counter()
+            status = "error"
+            wait = None
+            try:
+                with UPSTREAM_IN_FLIGHT.track():
+                    async with self.session.get(url=url, params=params, timeout=request_timeout) as response:
+                        status = response.status
+                        if response.status == 200:
+                            return response.status, await response.json()
+                        if response.status not in RETRY_STATUSES or attempt >= self.max_retries:
+                            return response.status, None
+                        wait = retry_after(response)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt >= self.max_retries:
+                    raise
+            finally:
+                UPSTREAM_SECONDS.observe(time.perf_counter() - started, endpoint=endpoint, status=status)
+
+            if wait is not None:
+                # Everyone backs off, the limiter holds all callers until then
+                self.limiter.pause(wait)
+            else:
+                await asyncio.sleep(self.backoff(attempt))
+            attempt += 1
+
+    async def get_shared(self, path, params=None, ttl=None):
+        """`get`, coalesced with identical calls in flight and briefly reused after.
+
+        The json is shared between callers, treat it as read-only. The call
+        queues on the limiter at the best priority among everyone waiting on it,
+        so an /info joining a warmer's request doesn't wait as background.
+        """
+        key = (self.url(path), tuple(sorted((params or {}).items())))
+        shared = self.shared.get(key)
+        if shared is not None:
+            shared.raise_to(current_priority.get())
+        return await self.flights.do(key, lambda: self.start_shared(key, path, params), ttl)
+
+    def start_shared(self, key, path, params):
+        # Registered right away, callers joining before the call first runs still raise it
+        shared = SharedPriority(current_priority.get())
+        self.shared[key] = shared
+        return self.shared_get(key, shared, path, params)
+
+    async def shared_get(self, key, shared, path, params):
+        # The call runs as its own task, the context var only applies to it
+        current_shared.set(shared)
+        try:
+            return await self.get(path, params)
+        finally:
+            if self.shared.get(key) is shared:
+                del self.shared[key]
+
+    def backoff(self, attempt):
+        return random.uniform(0, min(VESTIGE_BACKOFF_MAX, VESTIGE_BACKOFF_BASE * 2 ** attempt))